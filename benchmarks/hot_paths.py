@@ -0,0 +1,217 @@
+"""Micro-benchmarks for pure functions that run on every update.
+
+Reports ops/sec (best of several repeats) and peak bytes allocated per call
+(tracemalloc). Results can be saved as a baseline and later runs compared to
+it; the run fails when a case is slower or allocates more than the allowed
+regression threshold.
+
+Usage::
+
+    python -m benchmarks.hot_paths --save          # record benchmarks/baseline.json
+    python -m benchmarks.hot_paths                 # compare against it
+    python -m benchmarks.hot_paths -k menu -t 0.1  # subset, 10% threshold
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from aiogram.types import CallbackQuery, Chat, InlineQuery, Message, Update, User
+
+from bot.app.api.codec import JsonCodec
+from bot.app.api.schemas import parse_messages
+from bot.app.core import middlewares
+from bot.app.keyboards.base import build_menu
+from bot.app.utils.helpers import build_reply_markup, build_user_payload, extract_text, normalize_messages
+from bot.app.utils.logging import JsonFormatter
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def _user() -> User:
+    return User(id=123456789, is_bot=False, first_name="Alex", last_name="Doe", username="alex", language_code="en")
+
+
+def _chat() -> Chat:
+    return Chat(id=123456789, type="private", username="alex")
+
+
+def _menu(rows: int, columns: int, menu_type: str = "inline") -> dict[str, Any]:
+    return {
+        "type": menu_type,
+        "buttons": [
+            [{"text": f"Item {row}-{col}", "action": f"item:{row}:{col}"} for col in range(columns)]
+            for row in range(rows)
+        ],
+    }
+
+
+def _messages(count: int) -> dict[str, Any]:
+    return {
+        "messages": [
+            {"text": f"Message number {index} with some body text", "menu": _menu(2, 2)} if index % 5 == 0
+            else {"body": f"Message number {index}"}
+            for index in range(count)
+        ]
+    }
+
+
+def _updates() -> dict[str, Update]:
+    user, chat = _user(), _chat()
+    date = datetime.now(timezone.utc)
+    message = Message(message_id=1, date=date, chat=chat, from_user=user, text="hello")
+    return {
+        "message": Update(update_id=1, message=message),
+        "callback": Update(
+            update_id=2,
+            callback_query=CallbackQuery(
+                id="1", from_user=user, chat_instance="1", data="item:1:1", message=message
+            ),
+        ),
+        "inline": Update(
+            update_id=3,
+            inline_query=InlineQuery(id="1", from_user=user, query="pizza", offset=""),
+        ),
+    }
+
+
+def build_cases() -> dict[str, Callable[[], Any]]:
+    """Return benchmark name -> zero-argument callable."""
+
+    user, chat = _user(), _chat()
+    small_menu = _menu(2, 2)
+    huge_menu = _menu(100, 8)
+    reply_menu = _menu(10, 3, "reply")
+    short_messages = _messages(3)
+    long_messages = _messages(200)
+    message_item = {"text": "Welcome!", "menu": small_menu}
+    payload = build_user_payload(user, chat, "partner-1")
+    payload["action"] = "item:1:1"
+    codec = JsonCodec()
+    formatter = JsonFormatter()
+    record = logging.LogRecord("bot.app.core.middlewares", logging.INFO, __file__, 1, "update_processed", None, None)
+    record.__dict__.update({"user_id": 123456789, "chat_id": 123456789, "event": "message", "duration_ms": 12})
+    updates = _updates()
+
+    return {
+        "build_user_payload": lambda: build_user_payload(user, chat, "partner-1"),
+        "codec.encode": lambda: codec.encode(payload),
+        "normalize_messages.long": lambda: normalize_messages(long_messages),
+        "extract_text.body_alias": lambda: extract_text({"title": " ", "body": "Body text"}),
+        "parse_messages.short": lambda: parse_messages(short_messages),
+        "parse_messages.long": lambda: parse_messages(long_messages),
+        "build_reply_markup.small": lambda: build_reply_markup(message_item),
+        "build_menu.small": lambda: build_menu(small_menu),
+        "build_menu.huge": lambda: build_menu(huge_menu),
+        "build_menu.reply": lambda: build_menu(reply_menu),
+        "JsonFormatter.format": lambda: formatter.format(record),
+        "_event_type.callback": lambda: middlewares._event_type(updates["callback"]),
+        "_extract_user_id.inline": lambda: middlewares._extract_user_id(updates["inline"]),
+        "_extract_chat_id.callback": lambda: middlewares._extract_chat_id(updates["callback"]),
+        "_extract_message.message": lambda: middlewares._extract_message(updates["message"]),
+    }
+
+
+def measure(func: Callable[[], Any], min_time: float, repeats: int) -> dict[str, float]:
+    """Return best ops/sec and peak bytes allocated by a single call."""
+
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops *= 2
+
+    best = elapsed
+    for _ in range(repeats - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1] - before
+        del result
+    finally:
+        tracemalloc.stop()
+
+    return {"ops_per_sec": loops / best, "alloc_bytes": float(peak)}
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """Return human-readable regressions beyond ``threshold`` (a fraction)."""
+
+    regressions: list[str] = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current["ops_per_sec"] < previous["ops_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{name}: {current['ops_per_sec']:.0f} ops/s < baseline {previous['ops_per_sec']:.0f} ops/s"
+            )
+        if current["alloc_bytes"] > previous["alloc_bytes"] * (1 + threshold) + 64:
+            regressions.append(
+                f"{name}: {current['alloc_bytes']:.0f} B/call > baseline {previous['alloc_bytes']:.0f} B/call"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("-t", "--threshold", type=float, default=0.2, help="allowed regression fraction")
+    parser.add_argument("-k", "--filter", default="", help="only run cases containing this substring")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing repeat")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    cases = {name: func for name, func in build_cases().items() if args.filter in name}
+    baseline: dict[str, dict[str, float]] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    results: dict[str, dict[str, float]] = {}
+    print(f"{'case':<28} {'ops/sec':>12} {'B/call':>9} {'vs base':>8}")
+    for name, func in cases.items():
+        results[name] = measure(func, args.min_time, args.repeats)
+        previous = baseline.get(name)
+        change = f"{results[name]['ops_per_sec'] / previous['ops_per_sec'] - 1:+.0%}" if previous else "-"
+        print(f"{name:<28} {results[name]['ops_per_sec']:>12.0f} {results[name]['alloc_bytes']:>9.0f} {change:>8}")
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump({**baseline, **results}, fh, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Send throughput of the Telegram session at several pool sizes.
+
+Starts a local stub Bot API server that answers ``sendMessage`` after a fixed
+delay, then sends messages concurrently through ``create_session`` with each
+pool size and reports messages per second.
+
+Usage: ``python -m benchmarks.telegram_session [--messages 2000] [--latency-ms 20]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+from aiogram import Bot
+
+from bot.app.config import Settings
+from bot.app.core.bot import create_session
+
+
+BOT_TOKEN = "42:benchmark"
+
+
+async def _stub_handler(request: web.Request) -> web.Response:
+    await asyncio.sleep(request.app["latency"])
+    return web.json_response(
+        {
+            "ok": True,
+            "result": {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": 1, "type": "private"},
+                "text": "ok",
+            },
+        }
+    )
+
+
+async def _start_stub(latency: float) -> tuple[web.AppRunner, str]:
+    app = web.Application()
+    app["latency"] = latency
+    app.router.add_post("/bot{token}/{method}", _stub_handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def _measure(base_url: str, pool_size: int, messages: int, concurrency: int) -> float:
+    settings = Settings(
+        BOT_TOKEN=BOT_TOKEN,
+        API_URL="http://backend.invalid",
+        API_TOKEN="benchmark",
+        TELEGRAM_API_URL=base_url,
+        TELEGRAM_POOL_SIZE=pool_size,
+    )
+    bot = Bot(token=BOT_TOKEN, session=create_session(settings))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send() -> None:
+        async with semaphore:
+            await bot.send_message(chat_id=1, text="benchmark")
+
+    try:
+        await send()  # open the first connection outside the measurement
+        started = time.perf_counter()
+        await asyncio.gather(*(send() for _ in range(messages)))
+        return messages / (time.perf_counter() - started)
+    finally:
+        await bot.session.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 4, 16, 64, 100, 200])
+    args = parser.parse_args()
+
+    runner, base_url = await _start_stub(args.latency_ms / 1000)
+    try:
+        print(f"{'pool':>6} {'msg/s':>10}")
+        for pool_size in args.pool_sizes:
+            rate = await _measure(base_url, pool_size, args.messages, args.concurrency)
+            print(f"{pool_size:>6} {rate:>10.1f}")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
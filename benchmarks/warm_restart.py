@@ -0,0 +1,154 @@
+"""Backend calls saved by a warm restart under replayed traffic.
+
+Replays the same synthetic traffic (messages, flow callbacks and inline
+queries from a skewed user population) against three replicas backed by a
+mock backend transport:
+
+* ``previous`` - the replica being replaced; its caches are snapshotted on shutdown,
+* ``cold``     - a new replica starting empty,
+* ``warm``     - a new replica restored from the snapshot.
+
+Prints backend calls per endpoint for the cold and warm replicas and exits
+non-zero unless the warm replica made fewer partner and user sync calls.
+
+Usage: ``python -m benchmarks.warm_restart [--users 2000] [--updates 10000]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import os
+import random
+import sys
+import tempfile
+
+import httpx
+from aiogram.types import Chat, User
+
+from bot.app.config import Settings
+from bot.app.core.dependencies import Dependencies, build_dependencies
+from bot.app.core.snapshot import load_snapshot, save_snapshot
+from bot.app.utils.helpers import build_user_payload
+
+
+QUERIES = ["pizza", "pasta", "sushi", "burger", "salad", "coffee", "tea", "cake"]
+ACTIONS = [f"menu:{index}" for index in range(20)]
+
+
+def _traffic(users: int, updates: int, seed: int) -> list[tuple[str, int, str]]:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(users)]
+    user_ids = rng.choices(range(1, users + 1), weights=weights, k=updates)
+    traffic = []
+    for user_id in user_ids:
+        roll = rng.random()
+        if roll < 0.7:
+            traffic.append(("message", user_id, ""))
+        elif roll < 0.9:
+            traffic.append(("callback", user_id, rng.choice(ACTIONS)))
+        else:
+            traffic.append(("inline", user_id, rng.choice(QUERIES)))
+    return traffic
+
+
+def _mock_backend(calls: collections.Counter) -> httpx.MockTransport:
+    graph = {action: {"text": f"Static {action}"} for action in ACTIONS}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        calls[path] += 1
+        if path.endswith("/partner"):
+            return httpx.Response(200, json={"partner_id": "partner-1"})
+        if path.endswith("/flow"):
+            if request.url.params.get("version") == "v1":
+                return httpx.Response(200, json={"version": "v1"})
+            return httpx.Response(200, json={"version": "v1", "nodes": graph})
+        if path.endswith("/search"):
+            return httpx.Response(200, json={"results": [{"id": "1", "title": "Result"}], "complete": True})
+        return httpx.Response(200, json={})
+
+    return httpx.MockTransport(handler)
+
+
+async def _replica(settings: Settings, calls: collections.Counter, restore: bool) -> Dependencies:
+    deps = build_dependencies(settings)
+    await deps.backend._client.aclose()
+    deps.backend._client = httpx.AsyncClient(transport=_mock_backend(calls))
+    if restore:
+        await load_snapshot(deps, settings)
+    await deps.flow_service.start()
+    return deps
+
+
+async def _replay(deps: Dependencies, traffic: list[tuple[str, int, str]]) -> None:
+    for kind, user_id, value in traffic:
+        user = User(id=user_id, is_bot=False, first_name=f"User {user_id}")
+        chat = Chat(id=user_id, type="private")
+        partner_id = await deps.partner_service.resolve_partner_id()
+        await deps.user_service.sync_user(user, chat, partner_id)
+        if kind == "callback":
+            deps.flow_service.resolve(value)
+        elif kind == "inline":
+            payload = build_user_payload(user, chat, partner_id)
+            await deps.search_service.search(user_id, partner_id, value, "", payload)
+
+
+async def _shutdown(deps: Dependencies) -> None:
+    await deps.flow_service.close()
+    await deps.backend.close()
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--updates", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings = Settings(
+            BOT_TOKEN="42:benchmark",
+            API_URL="http://backend.invalid",
+            API_TOKEN="benchmark",
+            FLOW_ENABLED=True,
+            SEARCH_DEBOUNCE_MS=0,
+            SNAPSHOT_STORE="file",
+            SNAPSHOT_PATH=os.path.join(directory, "warm.json.gz"),
+        )
+        before = _traffic(args.users, args.updates, args.seed)
+        after = _traffic(args.users, args.updates, args.seed + 1)
+
+        previous = await _replica(settings, collections.Counter(), restore=False)
+        await _replay(previous, before)
+        await save_snapshot(previous, settings)
+        await _shutdown(previous)
+        snapshot_bytes = os.path.getsize(settings.SNAPSHOT_PATH)
+
+        results: dict[str, collections.Counter] = {}
+        for name, restore in (("cold", False), ("warm", True)):
+            calls: collections.Counter = collections.Counter()
+            replica = await _replica(settings, calls, restore)
+            await _replay(replica, after)
+            await _shutdown(replica)
+            results[name] = calls
+
+    print(f"snapshot: {snapshot_bytes} bytes, {args.updates} updates from {args.users} users replayed")
+    print(f"{'endpoint':<24} {'cold':>8} {'warm':>8} {'saved':>8}")
+    paths = sorted(set(results["cold"]) | set(results["warm"]))
+    for path in paths + ["total"]:
+        cold = sum(results["cold"].values()) if path == "total" else results["cold"][path]
+        warm = sum(results["warm"].values()) if path == "total" else results["warm"][path]
+        saved = f"{1 - warm / cold:.0%}" if cold else "-"
+        print(f"{path:<24} {cold:>8} {warm:>8} {saved:>8}")
+
+    checked = (settings.PARTNER_ENDPOINT, settings.USER_SYNC_ENDPOINT)
+    failed = [path for path in checked if results["warm"][path] >= results["cold"][path]]
+    for path in failed:
+        print(f"FAIL {path}: warm {results['warm'][path]} >= cold {results['cold'][path]}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
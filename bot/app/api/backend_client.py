@@ -4,11 +4,16 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from typing import Any
 
 import httpx
 
+from bot.app.api.codec import JsonCodec
+from bot.app.api.limiter import AdaptiveLimiter, Priority
+from bot.app.api.routing import Endpoint, EndpointPool
 from bot.app.config import Settings
+from bot.app.utils.events import BackendLatency, EventPipeline
 from bot.app.utils.exceptions import (
     BackendAuthError,
     BackendBadResponse,
@@ -16,18 +21,39 @@ from bot.app.utils.exceptions import (
     BackendTimeout,
     BackendUnavailable,
 )
+from bot.app.utils.tracing import current_traceparent, span
 
 
 logger = logging.getLogger(__name__)
 
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
 
 class BackendClient:
     """Unified backend client with retries and error mapping."""
 
-    def __init__(self, settings: Settings) -> None:
+    def __init__(self, settings: Settings, events: EventPipeline | None = None) -> None:
         self._settings = settings
+        self._events = events
+        self._codec = JsonCodec(
+            compression=settings.BACKEND_COMPRESSION,
+            compress_min_bytes=settings.BACKEND_COMPRESS_MIN_BYTES,
+        )
+        self._limiter = AdaptiveLimiter(
+            initial_limit=settings.LIMITER_INITIAL,
+            min_limit=settings.LIMITER_MIN,
+            max_limit=settings.LIMITER_MAX,
+            max_queue=settings.LIMITER_MAX_QUEUE,
+            max_wait=settings.LIMITER_MAX_WAIT,
+            tolerance=settings.LIMITER_LATENCY_TOLERANCE,
+        )
+        base_urls = [item.strip() for item in (settings.API_URLS or settings.API_URL).split(",") if item.strip()]
+        self._pool = EndpointPool(
+            base_urls,
+            eject_after=settings.BACKEND_EJECT_AFTER,
+            eject_seconds=settings.BACKEND_EJECT_SECONDS,
+        )
         self._client = httpx.AsyncClient(
-            base_url=settings.API_URL.rstrip("/"),
             headers={
                 "Authorization": f"Bearer {settings.API_TOKEN}",
                 "Accept": "application/json",
@@ -36,12 +62,45 @@ class BackendClient:
             timeout=settings.REQUEST_TIMEOUT,
         )
 
+    @property
+    def limiter(self) -> AdaptiveLimiter:
+        return self._limiter
+
+    @property
+    def endpoints(self) -> EndpointPool:
+        return self._pool
+
+    def start_health_checks(self) -> None:
+        """Probe every backend instance in the background (only with several ``API_URLS``)."""
+
+        self._pool.start_health_checks(self._check_health, self._settings.BACKEND_HEALTH_INTERVAL)
+
+    async def _check_health(self, endpoint: Endpoint) -> bool:
+        response = await self._client.get(
+            f"{endpoint.base_url}{self._settings.BACKEND_HEALTH_PATH}",
+            timeout=min(self._settings.REQUEST_TIMEOUT, self._settings.BACKEND_HEALTH_INTERVAL),
+        )
+        return response.status_code < 500
+
     async def close(self) -> None:
+        await self._pool.stop_health_checks()
         await self._client.aclose()
 
     async def _sleep_backoff(self, attempt: int) -> None:
         delay = self._settings.RETRY_BACKOFF * (2 ** (attempt - 1))
-        await asyncio.sleep(delay)
+        with span("backend.backoff", attempt=attempt, delay=delay):
+            await asyncio.sleep(delay)
+
+    def _emit_latency(self, method: str, path: str, status_code: int | None, attempt: int, started: float) -> None:
+        self._events.emit(
+            BackendLatency(
+                method=method,
+                path=path,
+                status_code=status_code,
+                attempt=attempt,
+                duration_ms=round((time.perf_counter() - started) * 1000, 2),
+            )
+        )
 
     async def request(
         self,
@@ -51,38 +110,97 @@ class BackendClient:
         json: dict[str, Any] | None = None,
         params: dict[str, Any] | None = None,
         partner_id: str | None = None,
+        priority: Priority = Priority.HIGH,
+        idempotent: bool | None = None,
     ) -> dict[str, Any]:
         url = path if path.startswith("/") else f"/{path}"
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
         headers = {}
         if partner_id:
             headers["X-Partner-Id"] = str(partner_id)
+        content = None
+        if json is not None:
+            content, encoding_headers = self._codec.encode(json)
+            headers.update(encoding_headers)
 
+        emit_latency = self._events is not None and self._events.enabled and url != self._settings.EVENTS_ENDPOINT
+        tried: set[Endpoint] = set()
+        endpoint: Endpoint | None = None
+        switch_endpoint = True
         for attempt in range(1, self._settings.RETRY_COUNT + 1):
             try:
-                response = await self._client.request(
-                    method,
-                    url,
-                    json=json,
-                    params=params,
-                    headers=headers or None,
-                )
+                with span("backend.request", method=method, path=url, attempt=attempt) as request_span:
+                    traceparent = current_traceparent()
+                    if traceparent:
+                        headers["traceparent"] = traceparent
+                    async with self._limiter.slot(priority) as slot:
+                        # Pick the instance and start the clock only once a slot is held, so
+                        # time queued in the limiter is not charged to the backend.
+                        # Retries of idempotent requests (and of requests that never reached
+                        # the backend) go to a different instance; others retry on the same one.
+                        if switch_endpoint:
+                            endpoint = self._pool.choose(exclude=tried)
+                            tried.add(endpoint)
+                        switch_endpoint = idempotent
+                        request_span.set("endpoint", endpoint.base_url)
+                        started = time.perf_counter()
+                        endpoint.in_flight += 1
+                        try:
+                            response = await self._client.request(
+                                method,
+                                f"{endpoint.base_url}{url}",
+                                content=content,
+                                params=params,
+                                headers=headers or None,
+                            )
+                        except httpx.TimeoutException:
+                            slot.overloaded = True
+                            raise
+                        finally:
+                            endpoint.in_flight -= 1
+                        slot.overloaded = response.status_code >= 500 or response.status_code == 429
+                    request_span.set("status_code", response.status_code)
             except httpx.TimeoutException as exc:
-                logger.warning("Backend timeout", extra={"attempt": attempt, "path": url})
+                self._pool.report(endpoint, time.perf_counter() - started, ok=False)
+                if isinstance(exc, httpx.ConnectTimeout):
+                    switch_endpoint = True
+                logger.warning(
+                    "Backend timeout", extra={"attempt": attempt, "path": url, "endpoint": endpoint.base_url}
+                )
+                if emit_latency:
+                    self._emit_latency(method, url, None, attempt, started)
                 if attempt >= self._settings.RETRY_COUNT:
                     raise BackendTimeout("Backend request timed out") from exc
                 await self._sleep_backoff(attempt)
                 continue
             except httpx.RequestError as exc:
-                logger.warning("Backend request error", extra={"attempt": attempt, "path": url})
+                self._pool.report(endpoint, time.perf_counter() - started, ok=False)
+                if isinstance(exc, httpx.ConnectError):
+                    switch_endpoint = True
+                logger.warning(
+                    "Backend request error", extra={"attempt": attempt, "path": url, "endpoint": endpoint.base_url}
+                )
+                if emit_latency:
+                    self._emit_latency(method, url, None, attempt, started)
                 if attempt >= self._settings.RETRY_COUNT:
                     raise BackendUnavailable("Backend unavailable") from exc
                 await self._sleep_backoff(attempt)
                 continue
 
+            self._pool.report(endpoint, time.perf_counter() - started, ok=response.status_code < 500)
+            if emit_latency:
+                self._emit_latency(method, url, response.status_code, attempt, started)
+
             if response.status_code >= 500:
                 logger.warning(
                     "Backend server error",
-                    extra={"status_code": response.status_code, "attempt": attempt, "path": url},
+                    extra={
+                        "status_code": response.status_code,
+                        "attempt": attempt,
+                        "path": url,
+                        "endpoint": endpoint.base_url,
+                    },
                 )
                 if attempt >= self._settings.RETRY_COUNT:
                     raise BackendUnavailable(
@@ -105,7 +223,7 @@ class BackendClient:
                 )
 
             try:
-                data = response.json()
+                data = self._codec.decode(response.content)
             except ValueError as exc:
                 raise BackendBadResponse("Backend returned invalid JSON") from exc
 
@@ -118,14 +236,36 @@ class BackendClient:
 
     async def sync_user(self, payload: dict[str, Any], partner_id: str | None) -> dict[str, Any]:
         return await self.request(
-            "POST", self._settings.USER_SYNC_ENDPOINT, json=payload, partner_id=partner_id
+            "POST",
+            self._settings.USER_SYNC_ENDPOINT,
+            json=payload,
+            partner_id=partner_id,
+            priority=Priority.LOW,
+            idempotent=True,
         )
 
     async def get_menu(self, payload: dict[str, Any], partner_id: str | None) -> dict[str, Any]:
-        return await self.request("GET", self._settings.MENU_ENDPOINT, params=payload, partner_id=partner_id)
+        return await self.request(
+            "GET", self._settings.MENU_ENDPOINT, params=payload, partner_id=partner_id, priority=Priority.LOW
+        )
 
     async def action(self, payload: dict[str, Any], partner_id: str | None) -> dict[str, Any]:
         return await self.request("POST", self._settings.ACTION_ENDPOINT, json=payload, partner_id=partner_id)
 
+    async def search(self, payload: dict[str, Any], partner_id: str | None) -> dict[str, Any]:
+        return await self.request(
+            "POST", self._settings.SEARCH_ENDPOINT, json=payload, partner_id=partner_id, priority=Priority.LOW
+        )
+
+    async def send_events(self, payload: dict[str, Any], partner_id: str | None) -> dict[str, Any]:
+        return await self.request(
+            "POST", self._settings.EVENTS_ENDPOINT, json=payload, partner_id=partner_id, priority=Priority.LOW
+        )
+
+    async def get_flow(self, params: dict[str, Any] | None, partner_id: str | None) -> dict[str, Any]:
+        return await self.request(
+            "GET", self._settings.FLOW_ENDPOINT, params=params, partner_id=partner_id, priority=Priority.LOW
+        )
+
     async def resolve_partner(self) -> dict[str, Any]:
         return await self.request("GET", self._settings.PARTNER_ENDPOINT)
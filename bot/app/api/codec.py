@@ -0,0 +1,73 @@
+"""JSON codec for backend requests and responses.
+
+Uses ``orjson`` when installed and falls back to the stdlib ``json`` module.
+Large request bodies can optionally be compressed with gzip or zstd
+(``zstandard`` package).
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+def dumps(value: Any) -> bytes:
+    """Encode a value as compact UTF-8 JSON."""
+
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(content: bytes | str) -> Any:
+    """Decode JSON; raises ``ValueError`` on malformed input."""
+
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class JsonCodec:
+    """Request/response codec used by ``BackendClient``."""
+
+    def __init__(
+        self,
+        compression: str | None = None,
+        compress_min_bytes: int = 2048,
+    ) -> None:
+        compression = (compression or "").lower() or None
+        if compression == "zstd" and zstandard is None:
+            compression = "gzip"
+        if compression not in {None, "gzip", "zstd"}:
+            raise ValueError(f"Unsupported backend compression: {compression}")
+        self._compression = compression
+        self._compress_min_bytes = compress_min_bytes
+        self._zstd = zstandard.ZstdCompressor() if compression == "zstd" else None
+
+    @property
+    def library(self) -> str:
+        return "orjson" if orjson is not None else "json"
+
+    def encode(self, payload: dict[str, Any]) -> tuple[bytes, dict[str, str]]:
+        """Return the request body and any extra headers it needs."""
+
+        body = dumps(payload)
+        if self._compression is None or len(body) < self._compress_min_bytes:
+            return body, {}
+        if self._zstd is not None:
+            return self._zstd.compress(body), {"Content-Encoding": "zstd"}
+        return gzip.compress(body, compresslevel=5), {"Content-Encoding": "gzip"}
+
+    def decode(self, content: bytes) -> Any:
+        return loads(content)
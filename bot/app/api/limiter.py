@@ -0,0 +1,171 @@
+"""Adaptive concurrency limiter for backend requests.
+
+The limit follows AIMD driven by observed latency: it grows by ``1/limit`` per
+successful request while the limiter is saturated, and is multiplied by
+``backoff`` when the caller reports an overload (timeout, 5xx, 429) or a
+request takes longer than ``tolerance`` times the smoothed latency. Requests
+that are cancelled or fail for other reasons release their slot without
+adjusting the limit. Requests over the limit wait in
+per-priority queues; a request is shed with ``BackendOverloaded`` when the
+queue is full or its expected wait exceeds ``max_wait``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator
+
+from bot.app.utils.exceptions import BackendOverloaded
+
+
+class Priority(IntEnum):
+    """Request priority classes; lower value is served first."""
+
+    HIGH = 0
+    LOW = 1
+
+
+class _Outcome:
+    __slots__ = ("overloaded",)
+
+    def __init__(self) -> None:
+        self.overloaded = False
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with priority queues and load shedding."""
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 20,
+        min_limit: int = 2,
+        max_limit: int = 200,
+        max_queue: int = 500,
+        max_wait: float = 5.0,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+        smoothing: float = 0.05,
+    ) -> None:
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._max_queue = max_queue
+        self._max_wait = max_wait
+        self._tolerance = tolerance
+        self._backoff = backoff
+        self._smoothing = smoothing
+        self._latency: float | None = None
+        self._in_flight = 0
+        self._queues: dict[Priority, deque[asyncio.Future]] = {priority: deque() for priority in Priority}
+        self.shed = 0
+
+    @property
+    def limit(self) -> int:
+        return max(int(self._limit), 1)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "queued": {priority.name.lower(): len(queue) for priority, queue in self._queues.items()},
+            "latency_ms": round(self._latency * 1000, 1) if self._latency is not None else None,
+            "shed": self.shed,
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.HIGH) -> AsyncIterator[_Outcome]:
+        """Hold a concurrency slot for one request.
+
+        Set ``overloaded`` on the yielded object to report a backend-side
+        overload. An exception leaving the block (including cancellation)
+        only releases the slot, unless ``overloaded`` was set before it.
+        """
+
+        await self._acquire(priority)
+        started = time.perf_counter()
+        outcome = _Outcome()
+        try:
+            yield outcome
+        except asyncio.CancelledError:
+            self._release(None, False)
+            raise
+        except BaseException:
+            self._release(time.perf_counter() - started if outcome.overloaded else None, outcome.overloaded)
+            raise
+        self._release(time.perf_counter() - started, outcome.overloaded)
+
+    async def _acquire(self, priority: Priority) -> None:
+        if self._in_flight < self.limit and not any(self._queues.values()):
+            self._in_flight += 1
+            return
+
+        queued = sum(len(queue) for queue in self._queues.values())
+        if queued >= self._max_queue:
+            self._shed("Backend request queue is full")
+        ahead = sum(len(self._queues[item]) for item in Priority if item <= priority)
+        if self._latency is not None and (ahead + 1) * self._latency / self.limit > self._max_wait:
+            self._shed("Backend overloaded, expected wait too long")
+
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues[priority]
+        queue.append(future)
+        try:
+            await asyncio.wait_for(future, self._max_wait)
+        except asyncio.TimeoutError:
+            self._discard(queue, future)
+            self._shed("Backend overloaded, wait timed out")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(None, False)
+            self._discard(queue, future)
+            raise
+
+    def _release(self, latency: float | None, overloaded: bool) -> None:
+        self._in_flight -= 1
+        if latency is not None:
+            self._adjust(latency, overloaded)
+        self._wake()
+
+    def _adjust(self, latency: float, overloaded: bool) -> None:
+        if overloaded or (self._latency is not None and latency > self._latency * self._tolerance):
+            self._limit = max(float(self._min_limit), self._limit * self._backoff)
+        elif self._in_flight + 1 >= self.limit:
+            self._limit = min(float(self._max_limit), self._limit + 1 / self._limit)
+        if not overloaded:
+            if self._latency is None:
+                self._latency = latency
+            else:
+                self._latency += (latency - self._latency) * self._smoothing
+
+    def _wake(self) -> None:
+        while self._in_flight < self.limit:
+            future = self._next_waiter()
+            if future is None:
+                return
+            self._in_flight += 1
+            future.set_result(None)
+
+    def _next_waiter(self) -> asyncio.Future | None:
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue:
+                future = queue.popleft()
+                if not future.done():
+                    return future
+        return None
+
+    def _shed(self, message: str) -> None:
+        self.shed += 1
+        raise BackendOverloaded(message)
+
+    @staticmethod
+    def _discard(queue: deque[asyncio.Future], future: asyncio.Future) -> None:
+        try:
+            queue.remove(future)
+        except ValueError:
+            pass
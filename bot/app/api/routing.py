@@ -0,0 +1,153 @@
+"""Latency-aware routing across several backend base URLs.
+
+Each request picks an instance by power-of-two-choices: two random healthy
+instances are compared by EWMA latency weighted by in-flight requests and the
+cheaper one wins. Instances with ``eject_after`` consecutive failures are
+ejected for ``eject_seconds`` (doubling on repeated ejections) and brought
+back early by a successful background health check.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+class Endpoint:
+    """Backend instance with its latency and health statistics."""
+
+    __slots__ = ("base_url", "latency", "in_flight", "failures", "ejections", "ejected_until")
+
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.latency = 0.0
+        self.in_flight = 0
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    def score(self) -> float:
+        return self.latency * (self.in_flight + 1)
+
+
+class EndpointPool:
+    """Pick backend instances and track their outcomes."""
+
+    def __init__(
+        self,
+        base_urls: list[str],
+        *,
+        smoothing: float = 0.3,
+        eject_after: int = 3,
+        eject_seconds: float = 10.0,
+        max_eject_seconds: float = 300.0,
+    ) -> None:
+        if not base_urls:
+            raise ValueError("At least one backend URL is required")
+        self.endpoints = [Endpoint(url) for url in base_urls]
+        self._smoothing = smoothing
+        self._eject_after = eject_after
+        self._eject_seconds = eject_seconds
+        self._max_eject_seconds = max_eject_seconds
+        self._health_task: asyncio.Task | None = None
+
+    def choose(self, exclude: set[Endpoint] | None = None) -> Endpoint:
+        """Return the preferred endpoint, avoiding ``exclude`` when possible."""
+
+        if len(self.endpoints) == 1:
+            return self.endpoints[0]
+        now = time.monotonic()
+        candidates = [item for item in self.endpoints if item.available(now) and item not in (exclude or ())]
+        if not candidates:
+            candidates = [item for item in self.endpoints if item not in (exclude or ())] or self.endpoints
+            return min(candidates, key=lambda item: item.ejected_until)
+        if len(candidates) == 1:
+            return candidates[0]
+        first, second = random.sample(candidates, 2)
+        return first if first.score() <= second.score() else second
+
+    def report(self, endpoint: Endpoint, latency: float, ok: bool) -> None:
+        """Record a request outcome; ``ok=False`` for timeouts, connection errors and 5xx."""
+
+        if ok:
+            endpoint.failures = 0
+            endpoint.ejections = 0
+            endpoint.latency += (latency - endpoint.latency) * self._smoothing
+            return
+        # Failures only count towards ejection: a timeout's duration would inflate
+        # the EWMA so much that the instance never wins a comparison again.
+        endpoint.failures += 1
+        if endpoint.failures >= self._eject_after and len(self.endpoints) > 1:
+            self._eject(endpoint)
+
+    def _eject(self, endpoint: Endpoint) -> None:
+        duration = min(self._eject_seconds * (2**endpoint.ejections), self._max_eject_seconds)
+        endpoint.ejections += 1
+        endpoint.failures = 0
+        endpoint.ejected_until = time.monotonic() + duration
+        logger.warning("Backend instance ejected", extra={"endpoint": endpoint.base_url, "seconds": duration})
+
+    def stats(self) -> list[dict[str, Any]]:
+        now = time.monotonic()
+        return [
+            {
+                "base_url": item.base_url,
+                "latency_ms": round(item.latency * 1000, 1),
+                "in_flight": item.in_flight,
+                "ejected": not item.available(now),
+            }
+            for item in self.endpoints
+        ]
+
+    def start_health_checks(self, check: Callable[[Endpoint], Awaitable[bool]], interval: float) -> None:
+        if len(self.endpoints) < 2 or interval <= 0 or self._health_task is not None:
+            return
+        self._health_task = asyncio.get_running_loop().create_task(self._health_loop(check, interval))
+
+    async def stop_health_checks(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    async def _health_loop(self, check: Callable[[Endpoint], Awaitable[bool]], interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            results = await asyncio.gather(*(self._probe(check, item) for item in self.endpoints))
+            now = time.monotonic()
+            for endpoint, (ok, latency) in zip(self.endpoints, results, strict=True):
+                if not ok:
+                    self.report(endpoint, latency, ok=False)
+                elif not endpoint.available(now):
+                    self._restore(endpoint, latency, now)
+                else:
+                    self.report(endpoint, latency, ok=True)
+
+    def _restore(self, endpoint: Endpoint, latency: float, now: float) -> None:
+        # Start from the best healthy latency so the instance gets traffic and is re-measured.
+        healthy = [item.latency for item in self.endpoints if item is not endpoint and item.available(now)]
+        endpoint.latency = min([latency, *healthy])
+        endpoint.ejected_until = 0.0
+        endpoint.failures = 0
+        logger.info("Backend instance restored", extra={"endpoint": endpoint.base_url})
+
+    @staticmethod
+    async def _probe(check: Callable[[Endpoint], Awaitable[bool]], endpoint: Endpoint) -> tuple[bool, float]:
+        started = time.perf_counter()
+        try:
+            ok = await check(endpoint)
+        except Exception:  # noqa: BLE001
+            ok = False
+        return ok, time.perf_counter() - started
@@ -0,0 +1,83 @@
+"""Typed schema for backend message responses."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from bot.app.utils.exceptions import BackendBadResponse
+
+
+_TEXT_KEYS = ("text", "message", "title", "body")
+_MENU_KEYS = ("menu", "keyboard", "reply_markup")
+
+
+@dataclass(frozen=True)
+class BotMessage:
+    """Single message to send: text plus an optional menu definition."""
+
+    text: str = ""
+    menu: dict[str, Any] | None = None
+
+    @classmethod
+    def from_payload(cls, data: Any) -> BotMessage:
+        """Validate one backend message.
+
+        ``text`` accepts the ``message``/``title``/``body`` aliases and ``menu``
+        accepts ``keyboard``/``reply_markup``; the first non-empty value wins.
+        Raises ``BackendBadResponse`` for non-object messages and wrongly
+        typed fields.
+        """
+
+        if not isinstance(data, dict):
+            raise BackendBadResponse("Backend message must be an object")
+
+        text = ""
+        for key in _TEXT_KEYS:
+            value = data.get(key)
+            if value is None:
+                continue
+            if not isinstance(value, str):
+                raise BackendBadResponse(f"Backend message field '{key}' must be a string")
+            if not text and value.strip():
+                text = value
+
+        menu = None
+        for key in _MENU_KEYS:
+            value = data.get(key)
+            if value is None:
+                continue
+            _validate_menu(key, value)
+            if menu is None:
+                menu = value
+
+        return cls(text=text, menu=menu)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"text": self.text, "menu": self.menu}
+
+
+def _validate_menu(key: str, menu: Any) -> None:
+    if not isinstance(menu, dict):
+        raise BackendBadResponse(f"Backend message field '{key}' must be an object")
+    if not isinstance(menu.get("type", "inline"), str):
+        raise BackendBadResponse(f"Backend menu '{key}.type' must be a string")
+    if not isinstance(menu.get("buttons", []), list):
+        raise BackendBadResponse(f"Backend menu '{key}.buttons' must be an array")
+
+
+def parse_messages(payload: Any) -> list[BotMessage]:
+    """Decode a backend response into validated messages.
+
+    Accepts a single message, a list of messages, or ``{"messages": [...]}``.
+    """
+
+    if payload is None:
+        return []
+    if isinstance(payload, dict) and isinstance(payload.get("messages"), list):
+        items = payload["messages"]
+    elif isinstance(payload, list):
+        items = payload
+    else:
+        items = [payload]
+    return [item if isinstance(item, BotMessage) else BotMessage.from_payload(item) for item in items]
@@ -16,6 +16,13 @@ class Settings(BaseSettings):
     API_URL: str
     API_TOKEN: str
 
+    TELEGRAM_API_URL: Optional[str] = None
+    TELEGRAM_API_LOCAL: bool = False
+    TELEGRAM_POOL_SIZE: int = 100
+    TELEGRAM_KEEPALIVE: float = 60.0
+    TELEGRAM_TIMEOUT: float = 60.0
+    TELEGRAM_PREWARM_CONNECTIONS: int = 0
+
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_PREFIX: str = "bot"
 
@@ -26,8 +33,38 @@ class Settings(BaseSettings):
     RETRY_COUNT: int = 3
     RETRY_BACKOFF: float = 0.5
 
+    API_URLS: Optional[str] = None
+    BACKEND_HEALTH_PATH: str = "/up"
+    BACKEND_HEALTH_INTERVAL: float = 10.0
+    BACKEND_EJECT_AFTER: int = 3
+    BACKEND_EJECT_SECONDS: float = 10.0
+
     RATE_LIMIT_SECONDS: float = 0.5
     USER_SYNC_TTL: int = 3600
+    REDIS_BATCHING: bool = False
+
+    SNAPSHOT_STORE: Optional[str] = None
+    SNAPSHOT_PATH: str = "snapshots/warm.json.gz"
+    SNAPSHOT_REDIS_KEY: str = "warm_snapshot"
+    SNAPSHOT_MAX_AGE: float = 900.0
+
+    CALLBACK_EARLY_ACK: bool = True
+    TYPING_INDICATOR: bool = True
+    TYPING_DELAY: float = 0.5
+    TYPING_INTERVAL: float = 4.5
+
+    INGRESS_MAX_CONCURRENCY: int = 100
+    INGRESS_CRITICAL_COMMANDS: str = "start"
+    INGRESS_CRITICAL_CALLBACK_PREFIXES: str = "pay:"
+    INGRESS_CRITICAL_DEPTH: int = 1000
+    INGRESS_CRITICAL_MAX_AGE: float = 60.0
+    INGRESS_INTERACTIVE_DEPTH: int = 500
+    INGRESS_INTERACTIVE_MAX_AGE: float = 20.0
+    INGRESS_BACKGROUND_DEPTH: int = 200
+    INGRESS_BACKGROUND_MAX_AGE: float = 10.0
+    INGRESS_OVERLOAD_DEPTH: int = 300
+    INGRESS_OVERLOAD_AGE: float = 3.0
+    INGRESS_BUSY_TEXT: Optional[str] = None
 
     PARTNER_ID: Optional[str] = None
     PARTNER_ENDPOINT: str = "/api/bot/partner"
@@ -37,6 +74,53 @@ class Settings(BaseSettings):
     MENU_ENDPOINT: str = "/api/bot/menu"
     ACTION_ENDPOINT: str = "/api/bot/action"
 
+    SEARCH_ENDPOINT: str = "/api/bot/search"
+    SEARCH_DEBOUNCE_MS: float = 300.0
+    SEARCH_CACHE_TTL: float = 60.0
+    SEARCH_CACHE_TIME: int = 30
+    SEARCH_CACHE_SIZE: int = 5000
+    SEARCH_MIN_PREFIX: int = 2
+
+    FLOW_ENABLED: bool = False
+    FLOW_ENDPOINT: str = "/api/bot/flow"
+    FLOW_REFRESH_INTERVAL: float = 60.0
+
+    BACKEND_COMPRESSION: Optional[str] = None
+    BACKEND_COMPRESS_MIN_BYTES: int = 2048
+
+    LIMITER_INITIAL: int = 20
+    LIMITER_MIN: int = 2
+    LIMITER_MAX: int = 200
+    LIMITER_MAX_QUEUE: int = 500
+    LIMITER_MAX_WAIT: float = 5.0
+    LIMITER_LATENCY_TOLERANCE: float = 2.0
+
+    EVENTS_SINK: Optional[str] = None
+    EVENTS_ENDPOINT: str = "/api/bot/events"
+    EVENTS_BUFFER_SIZE: int = 10000
+    EVENTS_BATCH_SIZE: int = 500
+    EVENTS_FLUSH_INTERVAL: float = 5.0
+    EVENTS_FILE_DIR: str = "events"
+    EVENTS_FILE_MAX_BYTES: int = 50 * 1024 * 1024
+    EVENTS_REDIS_STREAM: str = "events"
+    EVENTS_REDIS_MAXLEN: int = 1_000_000
+
+    TRACE_SAMPLE_RATE: float = 0.0
+    TRACE_SLOW_MS: float = 0.0
+    TRACE_EXPORT_PATH: Optional[str] = None
+    TRACE_OTLP_ENDPOINT: Optional[str] = None
+    TRACE_SERVICE_NAME: str = "telegram-bot"
+    TRACE_BUFFER_SIZE: int = 1000
+    TRACE_FLUSH_INTERVAL: float = 5.0
+
+    LOOP_LAG_INTERVAL: float = 0.1
+    LOOP_LAG_THRESHOLD_MS: float = 250.0
+    PROFILE_SLOW_UPDATE_MS: float = 0.0
+    PROFILE_UPDATES: int = 50
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_SIGNAL_SECONDS: float = 30.0
+    PROFILE_OUTPUT_DIR: str = "profiles"
+
     model_config = SettingsConfigDict(
         env_file=(".env", "bot/.env"),
         env_file_encoding="utf-8",
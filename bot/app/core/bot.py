@@ -2,60 +2,171 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Tuple
+import ssl
+from typing import Any, Tuple
 
-from aiogram import Bot, Dispatcher
+import certifi
+from aiogram import Bot, Dispatcher, __version__ as aiogram_version
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
 from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
+from aiohttp import ClientSession, TCPConnector
+from aiohttp.hdrs import USER_AGENT
+from aiohttp.http import SERVER_SOFTWARE
 
+from bot.app.api.codec import loads
 from bot.app.config import Settings
 from bot.app.core.dependencies import Dependencies, build_dependencies
+from bot.app.core.ingress import build_classifier
+from bot.app.core.redis_batch import BatchedRedisStorage
 from bot.app.core.middlewares import (
     BackendContextMiddleware,
     ErrorHandlingMiddleware,
+    EventsMiddleware,
+    IngressMiddleware,
+    LatencyMaskingMiddleware,
     LoggingMiddleware,
     RateLimitMiddleware,
+    RedisBatchMiddleware,
+    ResponseTimingMiddleware,
+    SendEventsMiddleware,
+    SlowUpdateProfilerMiddleware,
+    TelegramTracingMiddleware,
+    TracingMiddleware,
 )
-from bot.app.handlers import errors_router, start_router
+from bot.app.handlers import errors_router, inline_router, start_router
 from bot.app.utils.logging import configure_logging
 
 
 logger = logging.getLogger(__name__)
 
 
+class TelegramSession(AiohttpSession):
+    """``AiohttpSession`` whose connector also sets the keep-alive timeout."""
+
+    def __init__(self, *, limit: int, keepalive_timeout: float, **kwargs: Any) -> None:
+        super().__init__(limit=limit, **kwargs)
+        self._pool_size = limit
+        self._keepalive_timeout = keepalive_timeout
+
+    async def create_session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(
+                ssl=ssl.create_default_context(cafile=certifi.where()),
+                limit=self._pool_size,
+                keepalive_timeout=self._keepalive_timeout,
+                ttl_dns_cache=3600,
+            )
+            self._session = ClientSession(
+                connector=connector,
+                headers={USER_AGENT: f"{SERVER_SOFTWARE} aiogram/{aiogram_version}"},
+            )
+        return self._session
+
+
+def create_session(settings: Settings) -> AiohttpSession:
+    """Create Telegram API session with tuned connection pool and endpoint."""
+
+    api = PRODUCTION
+    if settings.TELEGRAM_API_URL:
+        api = TelegramAPIServer.from_base(settings.TELEGRAM_API_URL.rstrip("/"), is_local=settings.TELEGRAM_API_LOCAL)
+    return TelegramSession(
+        api=api,
+        limit=settings.TELEGRAM_POOL_SIZE,
+        keepalive_timeout=settings.TELEGRAM_KEEPALIVE,
+        timeout=settings.TELEGRAM_TIMEOUT,
+        json_loads=loads,
+    )
+
+
 def create_bot(settings: Settings) -> Bot:
     """Create aiogram Bot instance."""
 
     default = DefaultBotProperties(parse_mode=settings.PARSE_MODE)
-    return Bot(token=settings.BOT_TOKEN, default=default)
+    return Bot(token=settings.BOT_TOKEN, session=create_session(settings), default=default)
+
+
+async def prewarm_session(bot: Bot, connections: int) -> None:
+    """Open up to ``connections`` pooled connections before polling starts."""
+
+    if connections <= 0:
+        return
+    results = await asyncio.gather(*(bot.get_me() for _ in range(connections)), return_exceptions=True)
+    errors = [item for item in results if isinstance(item, BaseException)]
+    if errors:
+        logger.warning("Telegram session prewarm failed", extra={"errors": len(errors), "error": str(errors[0])})
+    else:
+        logger.info("telegram_session_prewarmed", extra={"connections": connections})
 
 
 def create_dispatcher(settings: Settings, deps: Dependencies) -> Dispatcher:
     """Create dispatcher with routers and middlewares."""
 
     key_builder = DefaultKeyBuilder(prefix=settings.REDIS_PREFIX, with_destiny=True)
-    storage = RedisStorage(deps.redis, key_builder=key_builder)
-    dispatcher = Dispatcher(storage=storage)
-
+    rate_limit = RateLimitMiddleware(
+        redis_client=deps.redis,
+        rate_limit_seconds=settings.RATE_LIMIT_SECONDS,
+        prefix=settings.REDIS_PREFIX,
+    )
+    if settings.REDIS_BATCHING:
+        # The batching middleware takes over FSM context and is registered after ingress below.
+        storage = BatchedRedisStorage(deps.redis, key_builder=key_builder)
+        dispatcher = Dispatcher(storage=storage, disable_fsm=True)
+    else:
+        dispatcher = Dispatcher(storage=RedisStorage(deps.redis, key_builder=key_builder))
+
+    if settings.INGRESS_MAX_CONCURRENCY > 0:
+        dispatcher.update.outer_middleware(
+            IngressMiddleware(
+                scheduler=deps.ingress,
+                classifier=build_classifier(settings),
+                busy_text=settings.INGRESS_BUSY_TEXT,
+            )
+        )
+    # Outer, so the trace is already open when the Redis batch runs.
+    dispatcher.update.outer_middleware(TracingMiddleware(deps.tracer))
+    if settings.REDIS_BATCHING:
+        dispatcher.fsm = RedisBatchMiddleware(
+            storage=storage,
+            prefetchers=[rate_limit],
+            events_isolation=dispatcher.fsm.events_isolation,
+            strategy=dispatcher.fsm.strategy,
+        )
+        dispatcher.update.outer_middleware(dispatcher.fsm)
+    if settings.PROFILE_SLOW_UPDATE_MS > 0:
+        dispatcher.update.middleware(
+            SlowUpdateProfilerMiddleware(
+                profiler=deps.profiler,
+                threshold_ms=settings.PROFILE_SLOW_UPDATE_MS,
+                updates=settings.PROFILE_UPDATES,
+            )
+        )
     dispatcher.update.middleware(ErrorHandlingMiddleware())
     dispatcher.update.middleware(LoggingMiddleware())
+    dispatcher.update.middleware(EventsMiddleware(deps.events))
     dispatcher.update.middleware(
-        RateLimitMiddleware(
-            redis_client=deps.redis,
-            rate_limit_seconds=settings.RATE_LIMIT_SECONDS,
-            prefix=settings.REDIS_PREFIX,
+        LatencyMaskingMiddleware(
+            ack_callbacks=settings.CALLBACK_EARLY_ACK,
+            typing_delay=settings.TYPING_DELAY if settings.TYPING_INDICATOR else None,
+            typing_interval=settings.TYPING_INTERVAL,
         )
     )
+    dispatcher.update.middleware(rate_limit)
     dispatcher.update.middleware(
         BackendContextMiddleware(
             backend=deps.backend,
             partner_service=deps.partner_service,
             user_service=deps.user_service,
+            flow_service=deps.flow_service,
+            search_service=deps.search_service,
         )
     )
 
     dispatcher.include_router(start_router)
+    dispatcher.include_router(inline_router)
     dispatcher.include_router(errors_router)
 
     return dispatcher
@@ -67,5 +178,10 @@ def build_app(settings: Settings) -> Tuple[Bot, Dispatcher, Dependencies]:
     configure_logging(settings.LOG_LEVEL)
     deps = build_dependencies(settings)
     bot = create_bot(settings)
+    bot.session.middleware(ResponseTimingMiddleware())
+    if deps.events.enabled:
+        bot.session.middleware(SendEventsMiddleware(deps.events))
+    if deps.tracer.enabled:
+        bot.session.middleware(TelegramTracingMiddleware())
     dispatcher = create_dispatcher(settings, deps)
     return bot, dispatcher, deps
@@ -8,8 +8,14 @@ import redis.asyncio as redis
 
 from bot.app.api.backend_client import BackendClient
 from bot.app.config import Settings
+from bot.app.core.ingress import IngressScheduler, build_ingress
+from bot.app.services.flow import FlowService
 from bot.app.services.partner import PartnerService
+from bot.app.services.search import InlineSearchService
 from bot.app.services.user import UserService
+from bot.app.utils.events import EventPipeline, build_event_sink
+from bot.app.utils.profiling import LoopLagMonitor, SamplingProfiler
+from bot.app.utils.tracing import Tracer, build_tracer
 
 
 @dataclass
@@ -19,22 +25,49 @@ class Dependencies:
     backend: BackendClient
     partner_service: PartnerService
     user_service: UserService
+    flow_service: FlowService
+    search_service: InlineSearchService
     redis: redis.Redis
+    ingress: IngressScheduler
+    events: EventPipeline
+    tracer: Tracer
+    loop_monitor: LoopLagMonitor
+    profiler: SamplingProfiler
 
     async def close(self) -> None:
+        await self.flow_service.close()
+        await self.events.close()
+        await self.loop_monitor.stop()
+        if self.profiler.active:
+            await self.profiler.dump("shutdown")
         await self.backend.close()
         await self.redis.close()
         await self.redis.connection_pool.disconnect()
+        await self.tracer.close()
 
 
 def build_dependencies(settings: Settings) -> Dependencies:
-    backend = BackendClient(settings)
+    events = EventPipeline(
+        capacity=settings.EVENTS_BUFFER_SIZE,
+        batch_size=settings.EVENTS_BATCH_SIZE,
+        flush_interval=settings.EVENTS_FLUSH_INTERVAL,
+    )
+    backend = BackendClient(settings, events=events)
     partner_service = PartnerService(backend, settings)
     user_service = UserService(backend, settings)
+    flow_service = FlowService(backend, partner_service, settings)
     redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    events.sink = build_event_sink(settings, backend, redis_client, partner_service)
     return Dependencies(
         backend=backend,
         partner_service=partner_service,
         user_service=user_service,
+        flow_service=flow_service,
+        search_service=InlineSearchService(backend, settings),
         redis=redis_client,
+        ingress=build_ingress(settings),
+        events=events,
+        tracer=build_tracer(settings),
+        loop_monitor=LoopLagMonitor(settings.LOOP_LAG_INTERVAL, settings.LOOP_LAG_THRESHOLD_MS),
+        profiler=SamplingProfiler(settings.PROFILE_INTERVAL_MS, settings.PROFILE_OUTPUT_DIR),
     )
@@ -0,0 +1,200 @@
+"""Ingress scheduling: priority lanes and load shedding for incoming updates.
+
+Each update is classified into a lane (``critical``, ``interactive`` or
+``background``) and must obtain one of ``max_concurrency`` processing slots
+before it reaches the dispatcher's handlers. Waiting updates sit in a bounded
+queue per lane and free slots always go to the highest-priority lane first.
+Updates are shed when their lane queue is full, when they waited longer than
+the lane's ``max_age``, or, for sheddable lanes, as soon as the scheduler is
+overloaded (too many queued updates or the oldest one is too old).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from aiogram.types import Update
+
+from bot.app.config import Settings
+
+
+CRITICAL = "critical"
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+
+@dataclass(frozen=True)
+class Lane:
+    """Priority lane definition; lanes are served in the order given."""
+
+    name: str
+    max_depth: int
+    max_age: float
+    sheddable: bool = False
+
+
+class _Waiter:
+    __slots__ = ("future", "enqueued")
+
+    def __init__(self, future: asyncio.Future, enqueued: float) -> None:
+        self.future = future
+        self.enqueued = enqueued
+
+
+class UpdateClassifier:
+    """Map an update to a lane by command, callback prefix or event type."""
+
+    def __init__(self, critical_commands: set[str], critical_callback_prefixes: tuple[str, ...]) -> None:
+        self._critical_commands = critical_commands
+        self._critical_callback_prefixes = critical_callback_prefixes
+
+    def __call__(self, update: Update) -> str:
+        if update.pre_checkout_query or update.shipping_query:
+            return CRITICAL
+        message = update.message
+        if message is not None:
+            if message.successful_payment:
+                return CRITICAL
+            text = message.text or ""
+            if text.startswith("/"):
+                command = text[1:].split(maxsplit=1)[0].split("@", 1)[0].lower() if len(text) > 1 else ""
+                return CRITICAL if command in self._critical_commands else INTERACTIVE
+            return BACKGROUND
+        if update.callback_query is not None:
+            data = update.callback_query.data or ""
+            if self._critical_callback_prefixes and data.startswith(self._critical_callback_prefixes):
+                return CRITICAL
+            return INTERACTIVE
+        if update.inline_query is not None:
+            return BACKGROUND
+        return INTERACTIVE
+
+
+class IngressScheduler:
+    """Bounded per-lane queues in front of update processing."""
+
+    def __init__(
+        self,
+        lanes: list[Lane],
+        *,
+        max_concurrency: int,
+        overload_depth: int,
+        overload_age: float,
+    ) -> None:
+        self._lanes = {lane.name: lane for lane in lanes}
+        self._queues: dict[str, deque[_Waiter]] = {lane.name: deque() for lane in lanes}
+        self._max_concurrency = max_concurrency
+        self._overload_depth = overload_depth
+        self._overload_age = overload_age
+        self._in_flight = 0
+        self.admitted: dict[str, int] = {lane.name: 0 for lane in lanes}
+        self.shed: dict[str, int] = {lane.name: 0 for lane in lanes}
+
+    def overloaded(self, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        if sum(len(queue) for queue in self._queues.values()) >= self._overload_depth:
+            return True
+        return any(queue and now - queue[0].enqueued >= self._overload_age for queue in self._queues.values())
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "in_flight": self._in_flight,
+            "overloaded": self.overloaded(now),
+            "lanes": {
+                name: {
+                    "depth": len(queue),
+                    "oldest_age_ms": int((now - queue[0].enqueued) * 1000) if queue else 0,
+                    "admitted": self.admitted[name],
+                    "shed": self.shed[name],
+                }
+                for name, queue in self._queues.items()
+            },
+        }
+
+    async def acquire(self, lane_name: str) -> bool:
+        """Wait for a processing slot; returns ``False`` if the update was shed."""
+
+        lane = self._lanes[lane_name]
+        if self._in_flight < self._max_concurrency and not any(self._queues.values()):
+            self._in_flight += 1
+            self.admitted[lane_name] += 1
+            return True
+
+        now = time.monotonic()
+        queue = self._queues[lane_name]
+        if len(queue) >= lane.max_depth or (lane.sheddable and self.overloaded(now)):
+            self.shed[lane_name] += 1
+            return False
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), now)
+        queue.append(waiter)
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.result():
+                self.release()
+            try:
+                queue.remove(waiter)
+            except ValueError:
+                pass
+            raise
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        while self._in_flight < self._max_concurrency:
+            waiter, lane_name = self._next_waiter(now)
+            if waiter is None:
+                return
+            self._in_flight += 1
+            self.admitted[lane_name] += 1
+            waiter.future.set_result(True)
+
+    def _next_waiter(self, now: float) -> tuple[_Waiter | None, str]:
+        for name, queue in self._queues.items():
+            max_age = self._lanes[name].max_age
+            while queue:
+                waiter = queue.popleft()
+                if waiter.future.done():
+                    continue
+                if now - waiter.enqueued > max_age:
+                    self.shed[name] += 1
+                    waiter.future.set_result(False)
+                    continue
+                return waiter, name
+        return None, ""
+
+
+def build_ingress(settings: Settings) -> IngressScheduler:
+    """Create ingress scheduler from settings."""
+
+    lanes = [
+        Lane(CRITICAL, settings.INGRESS_CRITICAL_DEPTH, settings.INGRESS_CRITICAL_MAX_AGE),
+        Lane(INTERACTIVE, settings.INGRESS_INTERACTIVE_DEPTH, settings.INGRESS_INTERACTIVE_MAX_AGE),
+        Lane(BACKGROUND, settings.INGRESS_BACKGROUND_DEPTH, settings.INGRESS_BACKGROUND_MAX_AGE, sheddable=True),
+    ]
+    return IngressScheduler(
+        lanes,
+        max_concurrency=settings.INGRESS_MAX_CONCURRENCY,
+        overload_depth=settings.INGRESS_OVERLOAD_DEPTH,
+        overload_age=settings.INGRESS_OVERLOAD_AGE,
+    )
+
+
+def build_classifier(settings: Settings) -> UpdateClassifier:
+    """Create update classifier from comma-separated settings."""
+
+    commands = {item.strip().lstrip("/").lower() for item in settings.INGRESS_CRITICAL_COMMANDS.split(",")}
+    prefixes = tuple(item.strip() for item in settings.INGRESS_CRITICAL_CALLBACK_PREFIXES.split(","))
+    return UpdateClassifier(
+        critical_commands={item for item in commands if item},
+        critical_callback_prefixes=tuple(item for item in prefixes if item),
+    )
@@ -1,23 +1,67 @@
-"""Custom middlewares for logging, context, rate limiting, and errors."""
+"""Custom middlewares for logging, tracing, context, rate limiting, and errors."""
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import logging
 import time
 from typing import Any, Awaitable, Callable
 
 from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.middleware import FSMContextMiddleware
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
 from aiogram.types import Update
 from redis.asyncio import Redis
 
 from bot.app.api.backend_client import BackendClient
+from bot.app.core.ingress import IngressScheduler, UpdateClassifier
+from bot.app.core.redis_batch import BatchedRedisStorage, Prefetcher, RedisBatch, batch_scope
+from bot.app.services.flow import FlowService
 from bot.app.services.partner import PartnerService
+from bot.app.services.search import InlineSearchService
 from bot.app.services.user import UserService
+from bot.app.utils.events import EventPipeline, SendResult, UpdateReceived
 from bot.app.utils.exceptions import BackendError
+from bot.app.utils.profiling import SamplingProfiler
+from bot.app.utils.tracing import Tracer, span
 
 
 logger = logging.getLogger(__name__)
 
+_update_latency: contextvars.ContextVar["UpdateLatency | None"] = contextvars.ContextVar(
+    "update_latency", default=None
+)
+
+
+class IngressMiddleware(BaseMiddleware):
+    """Admit updates through priority lanes and shed them under overload."""
+
+    def __init__(self, scheduler: IngressScheduler, classifier: UpdateClassifier, busy_text: str | None) -> None:
+        self._scheduler = scheduler
+        self._classifier = classifier
+        self._busy_text = busy_text
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any],
+    ) -> Any:
+        lane = self._classifier(event)
+        if not await self._scheduler.acquire(lane):
+            logger.warning("update_shed", extra={"lane": lane, "update_id": event.update_id})
+            if self._busy_text:
+                await _notify_busy(event, self._busy_text)
+            return None
+        try:
+            return await handler(event, data)
+        finally:
+            self._scheduler.release()
+
 
 class LoggingMiddleware(BaseMiddleware):
     """Structured logging of incoming updates."""
@@ -28,7 +72,8 @@ class LoggingMiddleware(BaseMiddleware):
         event: Update,
         data: dict[str, Any],
     ) -> Any:
-        started = time.perf_counter()
+        latency = UpdateLatency()
+        token = _update_latency.set(latency)
         user_id = _extract_user_id(event)
         chat_id = _extract_chat_id(event)
         event_type = _event_type(event)
@@ -36,20 +81,237 @@ class LoggingMiddleware(BaseMiddleware):
         try:
             return await handler(event, data)
         finally:
-            duration_ms = int((time.perf_counter() - started) * 1000)
+            _update_latency.reset(token)
+            duration_ms = int((time.perf_counter() - latency.started) * 1000)
             logger.info(
                 "update_processed",
-                extra={"user_id": user_id, "chat_id": chat_id, "event": event_type, "duration_ms": duration_ms},
+                extra={
+                    "user_id": user_id,
+                    "chat_id": chat_id,
+                    "event": event_type,
+                    "ack_ms": latency.ack_ms,
+                    "first_message_ms": latency.first_message_ms,
+                    "duration_ms": duration_ms,
+                },
+            )
+
+
+class EventsMiddleware(BaseMiddleware):
+    """Emit ``update_received`` events and expose the pipeline to handlers."""
+
+    def __init__(self, events: EventPipeline) -> None:
+        self._events = events
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any],
+    ) -> Any:
+        data["events"] = self._events
+        if self._events.enabled:
+            self._events.emit(
+                UpdateReceived(
+                    update_id=event.update_id,
+                    event=_event_type(event),
+                    user_id=_extract_user_id(event),
+                    chat_id=_extract_chat_id(event),
+                )
+            )
+        return await handler(event, data)
+
+
+class SendEventsMiddleware(BaseRequestMiddleware):
+    """Emit ``send_result`` events for outgoing Telegram messages."""
+
+    def __init__(self, events: EventPipeline) -> None:
+        self._events = events
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Any,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        name = method.__api_method__
+        if not _is_message_method(name):
+            return await make_request(bot, method)
+        started = time.perf_counter()
+        chat_id = getattr(method, "chat_id", None)
+        try:
+            response = await make_request(bot, method)
+        except Exception as exc:
+            self._emit(name, chat_id, started, type(exc).__name__)
+            raise
+        self._emit(name, chat_id, started, None)
+        return response
+
+    def _emit(self, name: str, chat_id: Any, started: float, error: str | None) -> None:
+        self._events.emit(
+            SendResult(
+                method=name,
+                chat_id=chat_id if isinstance(chat_id, int) else None,
+                ok=error is None,
+                duration_ms=round((time.perf_counter() - started) * 1000, 2),
+                error=error,
             )
+        )
+
+
+class TracingMiddleware(BaseMiddleware):
+    """Open a per-update trace that nested spans attach to."""
+
+    def __init__(self, tracer: Tracer) -> None:
+        self._tracer = tracer
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any],
+    ) -> Any:
+        if not self._tracer.enabled:
+            return await handler(event, data)
+        with self._tracer.trace("update", update_id=event.update_id, event=_event_type(event)):
+            return await handler(event, data)
+
+
+class TelegramTracingMiddleware(BaseRequestMiddleware):
+    """Record outgoing Telegram API calls as spans of the active trace."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Any,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        with span(f"telegram.{method.__api_method__}"):
+            return await make_request(bot, method)
+
+
+class SlowUpdateProfilerMiddleware(BaseMiddleware):
+    """Arm the sampling profiler for the next updates after a slow one."""
+
+    def __init__(self, profiler: SamplingProfiler, threshold_ms: float, updates: int) -> None:
+        self._profiler = profiler
+        self._threshold_ms = threshold_ms
+        self._updates = updates
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any],
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            await self._profiler.update_finished()
+            if duration_ms >= self._threshold_ms and not self._profiler.active:
+                logger.info("slow_update_profiling", extra={"duration_ms": int(duration_ms), "updates": self._updates})
+                self._profiler.arm(self._updates)
+
+
+class UpdateLatency:
+    """User-perceived latency milestones of one update, logged with ``update_processed``."""
+
+    __slots__ = ("started", "ack_ms", "first_message_ms", "typing_task")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.ack_ms: int | None = None
+        self.first_message_ms: int | None = None
+        self.typing_task: asyncio.Task | None = None
+
+    def acked(self) -> None:
+        if self.ack_ms is None:
+            self.ack_ms = int((time.perf_counter() - self.started) * 1000)
+
+    def message_sent(self) -> None:
+        if self.first_message_ms is None:
+            self.first_message_ms = int((time.perf_counter() - self.started) * 1000)
+        self.stop_typing()
+
+    def stop_typing(self) -> None:
+        if self.typing_task is not None and not self.typing_task.done():
+            self.typing_task.cancel()
+
+
+class LatencyMaskingMiddleware(BaseMiddleware):
+    """Acknowledge callbacks immediately and show ``typing`` while the response is slow."""
+
+    def __init__(self, ack_callbacks: bool, typing_delay: float | None, typing_interval: float) -> None:
+        self._ack_callbacks = ack_callbacks
+        self._typing_delay = typing_delay
+        self._typing_interval = typing_interval
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any],
+    ) -> Any:
+        latency = _update_latency.get()
+        typing_task: asyncio.Task | None = None
+        try:
+            if self._ack_callbacks and event.callback_query:
+                try:
+                    await event.callback_query.answer()
+                    data["callback_answered"] = True
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning("Early callback ack failed", extra={"error": str(exc)})
+
+            chat_id = _extract_chat_id(event)
+            if self._typing_delay is not None and chat_id is not None:
+                typing_task = asyncio.get_running_loop().create_task(
+                    _typing_keepalive(data["bot"], chat_id, self._typing_delay, self._typing_interval)
+                )
+                if latency is not None:
+                    latency.typing_task = typing_task
+            return await handler(event, data)
+        finally:
+            if typing_task is not None and not typing_task.done():
+                typing_task.cancel()
+
+
+class ResponseTimingMiddleware(BaseRequestMiddleware):
+    """Record callback acks and first sent message for the current update."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Any,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        response = await make_request(bot, method)
+        latency = _update_latency.get()
+        if latency is not None:
+            name = method.__api_method__
+            if name == "answerCallbackQuery":
+                latency.acked()
+            elif _is_message_method(name):
+                latency.message_sent()
+        return response
 
 
 class BackendContextMiddleware(BaseMiddleware):
     """Attach backend services and partner context to handler data."""
 
-    def __init__(self, backend: BackendClient, partner_service: PartnerService, user_service: UserService) -> None:
+    def __init__(
+        self,
+        backend: BackendClient,
+        partner_service: PartnerService,
+        user_service: UserService,
+        flow_service: FlowService,
+        search_service: InlineSearchService,
+    ) -> None:
         self._backend = backend
         self._partner_service = partner_service
         self._user_service = user_service
+        self._flow_service = flow_service
+        self._search_service = search_service
 
     async def __call__(
         self,
@@ -57,35 +319,112 @@ class BackendContextMiddleware(BaseMiddleware):
         event: Update,
         data: dict[str, Any],
     ) -> Any:
-        partner_id = await self._partner_service.resolve_partner_id()
+        with span("partner.resolve"):
+            partner_id = await self._partner_service.resolve_partner_id()
         data["partner_id"] = partner_id
         data["backend"] = self._backend
         data["user_service"] = self._user_service
+        data["flow"] = self._flow_service
+        data["search"] = self._search_service
         return await handler(event, data)
 
 
+class RedisBatchMiddleware(FSMContextMiddleware):
+    """FSM context middleware that batches the update's Redis commands.
+
+    Replaces aiogram's FSM middleware (``Dispatcher(disable_fsm=True)``): the
+    FSM state read and every prefetcher's reads go out in one pipeline before
+    the handlers run, and deferred writes are flushed in one pipeline afterwards.
+    The batch is available to handlers as ``data["redis_batch"]``.
+    """
+
+    def __init__(self, storage: BatchedRedisStorage, prefetchers: list[Prefetcher], **kwargs: Any) -> None:
+        super().__init__(storage=storage, **kwargs)
+        self._prefetchers = prefetchers
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any],
+    ) -> Any:
+        context = self.resolve_event_context(data["bot"], data)
+        data["fsm_storage"] = self.storage
+        with batch_scope(RedisBatch(self.storage.redis)) as batch:
+            if context is None:
+                return await self._handle(handler, event, data, batch, None)
+            async with self.events_isolation.lock(key=context.key):
+                return await self._handle(handler, event, data, batch, context)
+
+    async def _handle(
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any],
+        batch: RedisBatch,
+        context: FSMContext | None,
+    ) -> Any:
+        for prefetcher in self._prefetchers:
+            prefetcher.prefetch(event, batch)
+        if context is not None:
+            self.storage.prefetch_state(batch, context.key)
+        with span("redis.batch", commands=batch.pending_reads):
+            await batch.execute()
+        data["redis_batch"] = batch
+        if context is not None:
+            data.update({"state": context, "raw_state": await context.get_state()})
+        try:
+            return await handler(event, data)
+        finally:
+            try:
+                with span("redis.batch.flush", commands=batch.pending_writes):
+                    await batch.flush()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Redis batch flush failed", extra={"error": str(exc)})
+
+
 class RateLimitMiddleware(BaseMiddleware):
-    """Redis-backed rate limiting per user."""
+    """Redis-backed rate limiting per user.
+
+    With ``RedisBatchMiddleware`` the ``SET NX`` is prefetched in the update's
+    batch; otherwise it is sent on its own.
+    """
 
     def __init__(self, redis_client: Redis, rate_limit_seconds: float, prefix: str) -> None:
         self._redis = redis_client
         self._rate_limit = rate_limit_seconds
         self._prefix = prefix
 
+    def _key(self, event: Update) -> str | None:
+        user_id = _extract_user_id(event)
+        if user_id is None or self._rate_limit <= 0 or event.inline_query:
+            # Inline queries arrive per keystroke and are debounced by the search service instead.
+            return None
+        return f"{self._prefix}:rate:{user_id}"
+
+    def prefetch(self, event: Update, batch: RedisBatch) -> None:
+        key = self._key(event)
+        if key is not None:
+            batch.read("rate_limit", "set", key, "1", px=int(self._rate_limit * 1000), nx=True)
+
     async def __call__(
         self,
         handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
         event: Update,
         data: dict[str, Any],
     ) -> Any:
-        user_id = _extract_user_id(event)
-        if user_id is None or self._rate_limit <= 0:
+        key = self._key(event)
+        if key is None:
             return await handler(event, data)
 
-        ttl_ms = int(self._rate_limit * 1000)
-        key = f"{self._prefix}:rate:{user_id}"
+        batch: RedisBatch | None = data.get("redis_batch")
         try:
-            allowed = await self._redis.set(key, "1", px=ttl_ms, nx=True)
+            if batch is not None and "rate_limit" in batch:
+                with span("redis.rate_limit", batched=True):
+                    allowed = batch.result("rate_limit")
+            else:
+                with span("redis.rate_limit"):
+                    allowed = await self._redis.set(key, "1", px=int(self._rate_limit * 1000), nx=True)
         except Exception as exc:  # noqa: BLE001
             logger.warning("Rate limit redis error", extra={"error": str(exc)})
             return await handler(event, data)
@@ -118,6 +457,33 @@ class ErrorHandlingMiddleware(BaseMiddleware):
             raise
 
 
+async def _typing_keepalive(bot: Any, chat_id: int, delay: float, interval: float) -> None:
+    await asyncio.sleep(delay)
+    while True:
+        try:
+            await bot.send_chat_action(chat_id=chat_id, action="typing")
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Typing indicator failed", extra={"chat_id": chat_id, "error": str(exc)})
+            return
+        await asyncio.sleep(interval)
+
+
+async def _notify_busy(event: Update, text: str) -> None:
+    try:
+        if event.callback_query:
+            await event.callback_query.answer(text)
+        elif event.message:
+            await event.message.answer(text)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Busy reply failed", extra={"error": str(exc)})
+
+
+def _is_message_method(name: str) -> bool:
+    """Whether a Bot API method delivers a message to the user (``send*`` / ``editMessage*``)."""
+
+    return (name.startswith("send") and name != "sendChatAction") or name.startswith("editMessage")
+
+
 def _event_type(event: Update) -> str:
     if event.message:
         return "message"
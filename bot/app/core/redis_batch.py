@@ -0,0 +1,144 @@
+"""Per-update Redis batching.
+
+Every update gets a ``RedisBatch``. Middlewares register the commands whose
+results they need before the handlers run (rate limit ``SET NX``, FSM state
+``GET``, cache lookups) and ``RedisBatchMiddleware`` sends them in a single
+pipeline. Writes whose timing does not matter can be deferred with
+``RedisBatch.write`` and are sent in one more pipeline when the update is
+done. FSM state writes go to Redis immediately, so the next update from the
+same user sees the new state even while this one is still being handled.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+from contextlib import contextmanager
+from typing import Any, Iterator, Protocol, cast
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import StateType, StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+from aiogram.types import Update
+from redis.asyncio import Redis
+
+
+logger = logging.getLogger(__name__)
+
+_current_batch: contextvars.ContextVar["RedisBatch | None"] = contextvars.ContextVar("redis_batch", default=None)
+
+
+class RedisBatch:
+    """Reads executed together before an update is handled and writes flushed after it."""
+
+    def __init__(self, redis_client: Redis) -> None:
+        self._redis = redis_client
+        self._reads: list[tuple[str, str, tuple[Any, ...], dict[str, Any]]] = []
+        self._writes: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+        self._results: dict[str, Any] = {}
+
+    def read(self, name: str, command: str, *args: Any, **kwargs: Any) -> None:
+        """Register a command whose result is available as ``result(name)`` after ``execute``."""
+
+        self._reads.append((name, command, args, kwargs))
+
+    def write(self, command: str, *args: Any, **kwargs: Any) -> None:
+        """Defer a command until ``flush``."""
+
+        self._writes.append((command, args, kwargs))
+
+    def put(self, name: str, value: Any) -> None:
+        """Override a result, e.g. with a value written later in the same update."""
+
+        self._results[name] = value
+
+    @property
+    def pending_reads(self) -> int:
+        return len(self._reads)
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._writes)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._results
+
+    def result(self, name: str) -> Any:
+        """Return a read result; re-raises the error if the command failed."""
+
+        value = self._results[name]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    async def execute(self) -> None:
+        reads, self._reads = self._reads, []
+        if not reads:
+            return
+        pipe = self._redis.pipeline(transaction=False)
+        for _, command, args, kwargs in reads:
+            getattr(pipe, command)(*args, **kwargs)
+        try:
+            values = await pipe.execute(raise_on_error=False)
+        except Exception as exc:  # noqa: BLE001
+            values = [exc] * len(reads)
+        for (name, *_), value in zip(reads, values, strict=True):
+            self._results[name] = value
+
+    async def flush(self) -> None:
+        writes, self._writes = self._writes, []
+        if not writes:
+            return
+        pipe = self._redis.pipeline(transaction=False)
+        for command, args, kwargs in writes:
+            getattr(pipe, command)(*args, **kwargs)
+        await pipe.execute()
+
+
+class Prefetcher(Protocol):
+    """Middleware that registers the Redis reads it needs for an update."""
+
+    def prefetch(self, event: Update, batch: RedisBatch) -> None: ...
+
+
+def current_batch() -> RedisBatch | None:
+    return _current_batch.get()
+
+
+@contextmanager
+def batch_scope(batch: RedisBatch) -> Iterator[RedisBatch]:
+    token = _current_batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _current_batch.reset(token)
+
+
+class BatchedRedisStorage(RedisStorage):
+    """FSM storage that reads state from the current update's batch.
+
+    Writes go straight to Redis and also update the batch, so later reads in
+    the same update see them. Outside an update (no active batch) it behaves
+    like ``RedisStorage``.
+    """
+
+    def prefetch_state(self, batch: RedisBatch, key: StorageKey) -> None:
+        redis_key = self.key_builder.build(key, "state")
+        batch.read(f"state:{redis_key}", "get", redis_key)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        batch = current_batch()
+        redis_key = self.key_builder.build(key, "state")
+        if batch is None or f"state:{redis_key}" not in batch:
+            return await super().get_state(key)
+        value = batch.result(f"state:{redis_key}")
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return cast(str | None, value)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await super().set_state(key, state)
+        batch = current_batch()
+        if batch is not None:
+            redis_key = self.key_builder.build(key, "state")
+            batch.put(f"state:{redis_key}", state.state if isinstance(state, State) else state)
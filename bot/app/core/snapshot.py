@@ -0,0 +1,162 @@
+"""Warm restart: persist in-process caches across deploys.
+
+On graceful shutdown the hot state of the services (user sync timestamps,
+resolved partner id, flow graph, inline search cache) is written as one
+gzip-compressed JSON document to Redis or a local file. On startup it is read
+back and each service keeps only the entries that are still fresh for the
+snapshot's age, so a new replica does not start with a burst of user syncs
+and partner lookups.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import logging
+import os
+import time
+from typing import Any, Optional, Protocol
+
+from redis.asyncio import Redis
+
+from bot.app.api import codec
+from bot.app.config import Settings
+from bot.app.core.dependencies import Dependencies
+
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+class SnapshotStore(Protocol):
+    """Storage for one compressed snapshot blob."""
+
+    async def save(self, blob: bytes) -> None: ...
+
+    async def load(self) -> Optional[bytes]: ...
+
+
+class FileSnapshotStore:
+    """Snapshot in a local file, replaced atomically."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+
+    async def save(self, blob: bytes) -> None:
+        await asyncio.to_thread(self._write, blob)
+
+    def _write(self, blob: bytes) -> None:
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(blob)
+        os.replace(tmp_path, self._path)
+
+    async def load(self) -> Optional[bytes]:
+        return await asyncio.to_thread(self._read)
+
+    def _read(self) -> Optional[bytes]:
+        try:
+            with open(self._path, "rb") as fh:
+                return fh.read()
+        except FileNotFoundError:
+            return None
+
+
+class RedisSnapshotStore:
+    """Snapshot in a Redis key that expires after ``ttl`` seconds.
+
+    The blob is base64-encoded because the shared client decodes responses.
+    """
+
+    def __init__(self, redis_client: Redis, key: str, ttl: float) -> None:
+        self._redis = redis_client
+        self._key = key
+        self._ttl = max(int(ttl), 1)
+
+    async def save(self, blob: bytes) -> None:
+        await self._redis.set(self._key, base64.b64encode(blob).decode("ascii"), ex=self._ttl)
+
+    async def load(self) -> Optional[bytes]:
+        value = await self._redis.get(self._key)
+        if value is None:
+            return None
+        return base64.b64decode(value)
+
+
+def _services(deps: Dependencies) -> dict[str, Any]:
+    return {
+        "user": deps.user_service,
+        "partner": deps.partner_service,
+        "flow": deps.flow_service,
+        "search": deps.search_service,
+    }
+
+
+def encode_snapshot(deps: Dependencies) -> bytes:
+    document = {
+        "format": FORMAT_VERSION,
+        "created": time.time(),
+        "services": {name: service.snapshot() for name, service in _services(deps).items()},
+    }
+    return gzip.compress(codec.dumps(document))
+
+
+def restore_snapshot(deps: Dependencies, blob: bytes, max_age: float) -> dict[str, int]:
+    """Apply a snapshot blob; returns restored entry counts per service."""
+
+    document = codec.loads(gzip.decompress(blob))
+    if document.get("format") != FORMAT_VERSION:
+        return {}
+    age = max(time.time() - float(document.get("created", 0)), 0.0)
+    if age > max_age:
+        logger.info("warm_snapshot_expired", extra={"age_s": int(age)})
+        return {}
+    states = document.get("services", {})
+    return {name: service.restore(states.get(name) or {}, age) for name, service in _services(deps).items()}
+
+
+def build_snapshot_store(settings: Settings, redis_client: Redis) -> SnapshotStore | None:
+    """Create the configured store (``redis`` or ``file``), or ``None`` when disabled."""
+
+    store = (settings.SNAPSHOT_STORE or "").lower()
+    if not store:
+        return None
+    if store == "file":
+        return FileSnapshotStore(settings.SNAPSHOT_PATH)
+    if store == "redis":
+        key = f"{settings.REDIS_PREFIX}:{settings.SNAPSHOT_REDIS_KEY}"
+        return RedisSnapshotStore(redis_client, key, settings.SNAPSHOT_MAX_AGE)
+    raise ValueError(f"Unsupported snapshot store: {settings.SNAPSHOT_STORE}")
+
+
+async def save_snapshot(deps: Dependencies, settings: Settings) -> None:
+    store = build_snapshot_store(settings, deps.redis)
+    if store is None:
+        return
+    try:
+        blob = encode_snapshot(deps)
+        await store.save(blob)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Warm snapshot save failed", extra={"error": str(exc)})
+        return
+    logger.info("warm_snapshot_saved", extra={"bytes": len(blob)})
+
+
+async def load_snapshot(deps: Dependencies, settings: Settings) -> None:
+    store = build_snapshot_store(settings, deps.redis)
+    if store is None:
+        return
+    try:
+        blob = await store.load()
+        if blob is None:
+            return
+        restored = restore_snapshot(deps, blob, settings.SNAPSHOT_MAX_AGE)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Warm snapshot restore failed", extra={"error": str(exc)})
+        return
+    logger.info("warm_snapshot_restored", extra=restored)
@@ -1,6 +1,7 @@
 """Bot handlers package."""
 
 from .start import router as start_router
+from .inline import router as inline_router
 from .errors import router as errors_router
 
-__all__ = ["start_router", "errors_router"]
+__all__ = ["start_router", "inline_router", "errors_router"]
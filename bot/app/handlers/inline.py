@@ -0,0 +1,59 @@
+"""Inline mode handler backed by the backend search endpoint."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from aiogram import Router
+from aiogram.types import (
+    InlineKeyboardMarkup,
+    InlineQuery,
+    InlineQueryResultArticle,
+    InputTextMessageContent,
+)
+
+from bot.app.keyboards.base import build_menu
+from bot.app.services.search import InlineSearchService
+from bot.app.utils.helpers import build_user_payload
+
+
+router = Router()
+
+
+@router.inline_query()
+async def handle_inline_query(
+    query: InlineQuery,
+    search: InlineSearchService,
+    partner_id: str | None,
+) -> None:
+    payload = build_user_payload(query.from_user, None, partner_id)
+    result = await search.search(query.from_user.id, partner_id, query.query, query.offset, payload)
+    if result is None:
+        # Superseded by a newer query from the same user; Telegram drops this one anyway.
+        return
+
+    articles = [article for article in (_build_article(item) for item in result.results) if article]
+    await query.answer(
+        articles,
+        cache_time=result.cache_time,
+        is_personal=result.is_personal,
+        next_offset=result.next_offset or None,
+    )
+
+
+def _build_article(item: dict[str, Any]) -> InlineQueryResultArticle | None:
+    title = str(item.get("title", "")).strip()
+    text = str(item.get("text") or title).strip()
+    if not title or not text:
+        return None
+    menu = item.get("menu")
+    reply_markup = build_menu(menu) if isinstance(menu, dict) else None
+    return InlineQueryResultArticle(
+        id=str(item.get("id") or title)[:64],
+        title=title,
+        description=item.get("description"),
+        url=item.get("url"),
+        thumbnail_url=item.get("thumbnail_url"),
+        input_message_content=InputTextMessageContent(message_text=text),
+        reply_markup=reply_markup if isinstance(reply_markup, InlineKeyboardMarkup) else None,
+    )
@@ -7,7 +7,9 @@ from aiogram.filters import CommandStart
 from aiogram.types import CallbackQuery, Message
 
 from bot.app.api.backend_client import BackendClient
+from bot.app.services.flow import FlowService
 from bot.app.services.user import UserService
+from bot.app.utils.events import ActionEvent, EventPipeline
 from bot.app.utils.helpers import build_user_payload, respond_with_payload
 
 
@@ -19,6 +21,7 @@ async def handle_start(
     message: Message,
     backend: BackendClient,
     user_service: UserService,
+    events: EventPipeline,
     partner_id: str | None,
 ) -> None:
     await user_service.sync_user(message.from_user, message.chat, partner_id)
@@ -32,6 +35,9 @@ async def handle_start(
     payload = build_user_payload(message.from_user, message.chat, partner_id)
     if start_param:
         payload["start_param"] = start_param
+    events.emit(
+        ActionEvent(user_id=message.from_user.id, chat_id=message.chat.id, action=message.text or "", source="backend")
+    )
 
     response = await backend.start(payload, partner_id)
     await respond_with_payload(message, response)
@@ -42,22 +48,40 @@ async def handle_callback(
     query: CallbackQuery,
     backend: BackendClient,
     user_service: UserService,
+    flow: FlowService,
+    events: EventPipeline,
     partner_id: str | None,
+    callback_answered: bool = False,
 ) -> None:
     if not query.data:
-        await query.answer()
+        if not callback_answered:
+            await query.answer()
         return
 
     if query.from_user:
         await user_service.sync_user(query.from_user, query.message.chat if query.message else None, partner_id)
 
-    payload = build_user_payload(query.from_user, query.message.chat if query.message else None, partner_id)
-    payload["action"] = query.data
-
-    response = await backend.action(payload, partner_id)
+    chat = query.message.chat if query.message else None
+    chat_id = chat.id if chat else None
+    response = flow.resolve(query.data)
+    source = "flow" if response is not None else "backend"
+    events.emit(
+        ActionEvent(
+            user_id=query.from_user.id,
+            chat_id=chat_id,
+            action=query.data,
+            source=source,
+            flow_version=flow.version if response is not None else None,
+        )
+    )
+    if response is None:
+        payload = build_user_payload(query.from_user, chat, partner_id)
+        payload["action"] = query.data
+        response = await backend.action(payload, partner_id)
     if query.message:
         await respond_with_payload(query.message, response)
-    await query.answer()
+    if not callback_answered:
+        await query.answer()
 
 
 @router.message(F.text & ~F.text.startswith("/"))
@@ -65,12 +89,25 @@ async def handle_text_action(
     message: Message,
     backend: BackendClient,
     user_service: UserService,
+    flow: FlowService,
+    events: EventPipeline,
     partner_id: str | None,
 ) -> None:
     await user_service.sync_user(message.from_user, message.chat, partner_id)
 
-    payload = build_user_payload(message.from_user, message.chat, partner_id)
-    payload["action"] = message.text
-
-    response = await backend.action(payload, partner_id)
+    response = flow.resolve(message.text)
+    source = "flow" if response is not None else "backend"
+    events.emit(
+        ActionEvent(
+            user_id=message.from_user.id,
+            chat_id=message.chat.id,
+            action=message.text,
+            source=source,
+            flow_version=flow.version if response is not None else None,
+        )
+    )
+    if response is None:
+        payload = build_user_payload(message.from_user, message.chat, partner_id)
+        payload["action"] = message.text
+        response = await backend.action(payload, partner_id)
     await respond_with_payload(message, response)
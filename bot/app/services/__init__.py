@@ -1,6 +1,8 @@
 """Domain services (thin wrappers around backend)."""
 
+from .flow import FlowService
 from .partner import PartnerService
+from .search import InlineSearchService
 from .user import UserService
 
-__all__ = ["PartnerService", "UserService"]
+__all__ = ["FlowService", "InlineSearchService", "PartnerService", "UserService"]
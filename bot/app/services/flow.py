@@ -0,0 +1,117 @@
+"""Locally executed navigation graph published by the backend."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Optional
+
+from bot.app.api.backend_client import BackendClient
+from bot.app.api.schemas import BotMessage, parse_messages
+from bot.app.config import Settings
+from bot.app.services.partner import PartnerService
+from bot.app.utils.exceptions import BackendError
+
+
+logger = logging.getLogger(__name__)
+
+
+class FlowService:
+    """Resolve static actions from a versioned flow graph without a backend call.
+
+    The graph maps an action (callback data or reply text) to the messages the
+    backend would return for it. Actions missing from the graph are dynamic and
+    still go to ``/api/bot/action``. Local hits are reported by the handlers as
+    ``action`` events with ``source="flow"``.
+    """
+
+    def __init__(self, backend: BackendClient, partner_service: PartnerService, settings: Settings) -> None:
+        self._backend = backend
+        self._partner_service = partner_service
+        self._settings = settings
+        self._version: Optional[str] = None
+        self._nodes: dict[str, list[BotMessage]] = {}
+        self._refresh_task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._settings.FLOW_ENABLED
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._version
+
+    def resolve(self, action: str) -> list[BotMessage] | None:
+        """Return the static response for ``action`` or ``None`` if it is dynamic."""
+
+        return self._nodes.get(action)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "version": self._version,
+            "nodes": {action: [item.to_dict() for item in messages] for action, messages in self._nodes.items()},
+        }
+
+    def restore(self, state: dict[str, Any], age: float) -> int:
+        """Load a previously snapshotted graph; ``start`` then only asks for newer versions."""
+
+        if not self.enabled or self._version is not None or not state.get("version"):
+            return 0
+        try:
+            self._nodes = {action: parse_messages(payload) for action, payload in state.get("nodes", {}).items()}
+        except BackendError:
+            return 0
+        self._version = str(state["version"])
+        return len(self._nodes)
+
+    async def start(self) -> None:
+        """Load the graph and start the background refresh loop."""
+
+        if not self.enabled:
+            return
+        await self.refresh()
+        loop = asyncio.get_running_loop()
+        self._refresh_task = loop.create_task(self._refresh_loop())
+
+    async def close(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+
+    async def refresh(self) -> bool:
+        """Fetch the graph; returns ``True`` when a new version was applied."""
+
+        params = {"version": self._version} if self._version else None
+        try:
+            partner_id = await self._partner_service.resolve_partner_id()
+            response = await self._backend.get_flow(params, partner_id)
+        except BackendError as exc:
+            logger.warning("Flow graph refresh failed", extra={"error": str(exc)})
+            return False
+
+        version = response.get("version")
+        if version is None or str(version) == self._version:
+            return False
+        nodes = response.get("nodes")
+        if not isinstance(nodes, dict):
+            logger.warning("Flow graph has no nodes", extra={"version": version})
+            return False
+
+        parsed: dict[str, list[BotMessage]] = {}
+        for action, payload in nodes.items():
+            try:
+                parsed[str(action)] = parse_messages(payload)
+            except BackendError:
+                logger.warning("Skipping invalid flow node", extra={"action": action, "version": version})
+        self._nodes = parsed
+        self._version = str(version)
+        logger.info("flow_graph_loaded", extra={"version": self._version, "nodes": len(parsed)})
+        return True
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._settings.FLOW_REFRESH_INTERVAL)
+            await self.refresh()
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Optional
+from typing import Any, Optional
 
 from bot.app.api.backend_client import BackendClient
 from bot.app.config import Settings
@@ -18,6 +18,15 @@ class PartnerService:
         self._lock = asyncio.Lock()
         self._cached: Optional[str] = settings.PARTNER_ID
 
+    def snapshot(self) -> dict[str, Any]:
+        return {"partner_id": self._cached}
+
+    def restore(self, state: dict[str, Any], age: float) -> int:
+        if self._cached or not state.get("partner_id"):
+            return 0
+        self._cached = str(state["partner_id"])
+        return 1
+
     async def resolve_partner_id(self) -> Optional[str]:
         if self._cached:
             return self._cached
@@ -0,0 +1,222 @@
+"""Inline query search with per-user debouncing and a shared result cache."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+from bot.app.api.backend_client import BackendClient
+from bot.app.config import Settings
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """Backend search answer for one inline query."""
+
+    results: list[dict[str, Any]] = field(default_factory=list)
+    cache_time: int = 0
+    is_personal: bool = False
+    next_offset: str = ""
+    complete: bool = False
+
+
+class _Inflight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class InlineSearchService:
+    """Answer inline queries with as few backend searches as possible.
+
+    * Queries are debounced per user: a newer query cancels the user's pending
+      one, and the backend request is cancelled once nobody waits for it.
+    * Identical in-flight searches (same partner, normalized query and offset)
+      are shared between users, but only for queries whose last answer was
+      not ``is_personal``; other searches are never shared.
+    * Results are cached with a TTL. When the backend marks a result set as
+      ``complete``, longer queries starting with the same prefix are answered
+      by filtering it locally.
+    """
+
+    def __init__(self, backend: BackendClient, settings: Settings) -> None:
+        self._backend = backend
+        self._settings = settings
+        self._cache: OrderedDict[tuple[Optional[str], str, str], tuple[float, SearchResult]] = OrderedDict()
+        self._inflight: dict[tuple[Optional[str], str, str, Optional[int]], _Inflight] = {}
+        self._public: OrderedDict[tuple[Optional[str], str], None] = OrderedDict()
+        self._pending: dict[int, asyncio.Task] = {}
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return unexpired cache entries as ``[partner_id, query, offset, ttl_left, result]``."""
+
+        now = time.monotonic()
+        return {
+            "entries": [
+                [key[0], key[1], key[2], round(expires - now, 1), asdict(result)]
+                for key, (expires, result) in self._cache.items()
+                if expires > now
+            ]
+        }
+
+    def restore(self, state: dict[str, Any], age: float) -> int:
+        now = time.monotonic()
+        restored = 0
+        for partner_id, query, offset, ttl_left, result in state.get("entries", []):
+            remaining = ttl_left - age
+            if remaining <= 0 or (partner_id, query, offset) in self._cache:
+                continue
+            self._cache[(partner_id, query, offset)] = (now + remaining, SearchResult(**result))
+            self._mark_public(partner_id, query, True)
+            restored += 1
+        while len(self._cache) > self._settings.SEARCH_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return restored
+
+    async def search(
+        self,
+        user_id: int,
+        partner_id: Optional[str],
+        query: str,
+        offset: str,
+        payload: dict[str, Any],
+    ) -> SearchResult | None:
+        """Return results, or ``None`` if a newer query from the user superseded this one."""
+
+        previous = self._pending.get(user_id)
+        if previous is not None and not previous.done():
+            previous.cancel()
+
+        normalized = normalize_query(query)
+        cached = self._lookup(partner_id, normalized, offset)
+        if cached is not None:
+            return cached
+
+        task = asyncio.get_running_loop().create_task(
+            self._debounced(user_id, partner_id, normalized, offset, payload)
+        )
+        self._pending[user_id] = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if task.cancelled():
+                return None
+            raise
+        finally:
+            if self._pending.get(user_id) is task:
+                del self._pending[user_id]
+
+    async def _debounced(
+        self,
+        user_id: int,
+        partner_id: Optional[str],
+        normalized: str,
+        offset: str,
+        payload: dict[str, Any],
+    ) -> SearchResult:
+        await asyncio.sleep(self._settings.SEARCH_DEBOUNCE_MS / 1000)
+        # The request carries the first caller's user payload, so it may only be
+        # shared when the backend is known to answer this query non-personally.
+        owner = None if (partner_id, normalized) in self._public else user_id
+        key = (partner_id, normalized, offset, owner)
+        entry = self._inflight.get(key)
+        if entry is None or entry.task.done():
+            request = {**payload, "query": normalized, "offset": offset}
+            entry = _Inflight(asyncio.get_running_loop().create_task(self._fetch(key, request)))
+            self._inflight[key] = entry
+        entry.waiters += 1
+        try:
+            return await asyncio.shield(entry.task)
+        finally:
+            entry.waiters -= 1
+            if entry.waiters == 0 and not entry.task.done():
+                entry.task.cancel()
+
+    async def _fetch(
+        self,
+        key: tuple[Optional[str], str, str, Optional[int]],
+        request: dict[str, Any],
+    ) -> SearchResult:
+        try:
+            response = await self._backend.search(request, key[0])
+        finally:
+            self._inflight.pop(key, None)
+        raw_results = response.get("results")
+        result = SearchResult(
+            results=[item for item in raw_results if isinstance(item, dict)] if isinstance(raw_results, list) else [],
+            cache_time=_cache_time(response.get("cache_time"), self._settings.SEARCH_CACHE_TIME),
+            is_personal=bool(response.get("is_personal", False)),
+            next_offset=str(response.get("next_offset") or ""),
+            complete=bool(response.get("complete", False)),
+        )
+        self._mark_public(key[0], key[1], not result.is_personal)
+        if not result.is_personal:
+            self._store(key[:3], result)
+        return result
+
+    def _mark_public(self, partner_id: Optional[str], normalized: str, public: bool) -> None:
+        if not public:
+            self._public.pop((partner_id, normalized), None)
+            return
+        self._public[(partner_id, normalized)] = None
+        self._public.move_to_end((partner_id, normalized))
+        while len(self._public) > self._settings.SEARCH_CACHE_SIZE:
+            self._public.popitem(last=False)
+
+    def _lookup(self, partner_id: Optional[str], normalized: str, offset: str) -> SearchResult | None:
+        now = time.monotonic()
+        hit = self._get_fresh((partner_id, normalized, offset), now)
+        if hit is not None or offset:
+            return hit
+        for end in range(len(normalized) - 1, self._settings.SEARCH_MIN_PREFIX - 1, -1):
+            prefix_hit = self._get_fresh((partner_id, normalized[:end], ""), now)
+            if prefix_hit is not None and prefix_hit.complete:
+                return SearchResult(
+                    results=[item for item in prefix_hit.results if _matches(item, normalized)],
+                    cache_time=prefix_hit.cache_time,
+                    complete=True,
+                )
+        return None
+
+    def _get_fresh(self, key: tuple[Optional[str], str, str], now: float) -> SearchResult | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry[1]
+
+    def _store(self, key: tuple[Optional[str], str, str], result: SearchResult) -> None:
+        self._cache[key] = (time.monotonic() + self._settings.SEARCH_CACHE_TTL, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._settings.SEARCH_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so equivalent queries share a cache key."""
+
+    return " ".join(query.lower().split())
+
+
+def _cache_time(value: Any, default: int) -> int:
+    """Backend ``cache_time`` as a non-negative int, or ``default`` if missing or invalid."""
+
+    if value is None or isinstance(value, bool):
+        return default
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return default
+
+
+def _matches(item: dict[str, Any], normalized: str) -> bool:
+    haystack = f"{item.get('title', '')} {item.get('description', '')}".lower()
+    return normalized in haystack
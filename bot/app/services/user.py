@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+import logging
 import time
-from typing import Optional
+from typing import Any, Optional
 
 from aiogram.types import Chat, User
 
 from bot.app.api.backend_client import BackendClient
 from bot.app.config import Settings
+from bot.app.utils.exceptions import BackendOverloaded
 from bot.app.utils.helpers import build_user_payload
+from bot.app.utils.tracing import span
+
+
+logger = logging.getLogger(__name__)
 
 
 class UserService:
@@ -20,6 +26,21 @@ class UserService:
         self._settings = settings
         self._last_sync: dict[int, float] = {}
 
+    def snapshot(self) -> dict[str, Any]:
+        """Return sync timestamps still within ``USER_SYNC_TTL`` as ``[user_id, ts]`` pairs."""
+
+        horizon = time.time() - self._settings.USER_SYNC_TTL
+        return {"synced": [[user_id, int(ts)] for user_id, ts in self._last_sync.items() if ts > horizon]}
+
+    def restore(self, state: dict[str, Any], age: float) -> int:
+        horizon = time.time() - self._settings.USER_SYNC_TTL
+        restored = 0
+        for user_id, ts in state.get("synced", []):
+            if ts > horizon and ts > self._last_sync.get(user_id, 0):
+                self._last_sync[int(user_id)] = float(ts)
+                restored += 1
+        return restored
+
     async def sync_user(
         self,
         user: User,
@@ -33,6 +54,12 @@ class UserService:
             if last_time and (time.time() - last_time) < self._settings.USER_SYNC_TTL:
                 return
 
-        payload = build_user_payload(user, chat, partner_id)
-        await self._backend.sync_user(payload, partner_id)
+        with span("user.sync", user_id=user.id):
+            payload = build_user_payload(user, chat, partner_id)
+            try:
+                await self._backend.sync_user(payload, partner_id)
+            except BackendOverloaded:
+                # Low-priority sync was shed; retry on the user's next update.
+                logger.info("user_sync_shed", extra={"user_id": user.id})
+                return
         self._last_sync[user.id] = time.time()
@@ -0,0 +1,246 @@
+"""Buffered analytics event pipeline.
+
+Middlewares, handlers and the backend client emit typed events into a bounded
+in-memory ring buffer; a background task flushes them in batches to a sink
+(compressed NDJSON files, a Redis Stream or a backend bulk endpoint). When
+the buffer is full the oldest events are dropped and counted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, ClassVar, Optional, Protocol
+
+from redis.asyncio import Redis
+
+from bot.app.config import Settings
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, kw_only=True)
+class Event:
+    """Base analytics event."""
+
+    kind: ClassVar[str] = "event"
+    ts: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"kind": self.kind, **asdict(self)}
+
+
+@dataclass(frozen=True, kw_only=True)
+class UpdateReceived(Event):
+    kind: ClassVar[str] = "update_received"
+    update_id: int
+    event: str
+    user_id: Optional[int]
+    chat_id: Optional[int]
+
+
+@dataclass(frozen=True, kw_only=True)
+class ActionEvent(Event):
+    kind: ClassVar[str] = "action"
+    user_id: Optional[int]
+    chat_id: Optional[int]
+    action: str
+    source: str
+    flow_version: Optional[str] = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class BackendLatency(Event):
+    kind: ClassVar[str] = "backend_latency"
+    method: str
+    path: str
+    status_code: Optional[int]
+    attempt: int
+    duration_ms: float
+
+
+@dataclass(frozen=True, kw_only=True)
+class SendResult(Event):
+    kind: ClassVar[str] = "send_result"
+    method: str
+    chat_id: Optional[int]
+    ok: bool
+    duration_ms: float
+    error: Optional[str] = None
+
+
+class EventSink(Protocol):
+    """Destination for flushed event batches."""
+
+    async def write(self, events: list[dict[str, Any]]) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class NdjsonFileSink:
+    """Gzip-compressed NDJSON files rotated by size.
+
+    Each batch is appended as a separate gzip member, so files stay readable
+    with ``zcat`` even if the process stops mid-file.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._path: str | None = None
+        self._sequence = 0
+
+    async def write(self, events: list[dict[str, Any]]) -> None:
+        data = "".join(json.dumps(item, ensure_ascii=False, default=str) + "\n" for item in events)
+        await asyncio.to_thread(self._append, gzip.compress(data.encode("utf-8")))
+
+    def _append(self, chunk: bytes) -> None:
+        if self._path is None or os.path.getsize(self._path) + len(chunk) > self._max_bytes:
+            os.makedirs(self._directory, exist_ok=True)
+            stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+            self._sequence += 1
+            name = f"events-{stamp}-{os.getpid()}-{self._sequence}.ndjson.gz"
+            self._path = os.path.join(self._directory, name)
+        with open(self._path, "ab") as fh:
+            fh.write(chunk)
+
+    async def close(self) -> None:
+        return None
+
+
+class RedisStreamSink:
+    """Append events to a capped Redis Stream in one pipeline per batch."""
+
+    def __init__(self, redis_client: Redis, stream: str, maxlen: int) -> None:
+        self._redis = redis_client
+        self._stream = stream
+        self._maxlen = maxlen
+
+    async def write(self, events: list[dict[str, Any]]) -> None:
+        pipe = self._redis.pipeline(transaction=False)
+        for item in events:
+            pipe.xadd(self._stream, {"data": json.dumps(item, ensure_ascii=False, default=str)}, maxlen=self._maxlen)
+        await pipe.execute()
+
+    async def close(self) -> None:
+        return None
+
+
+class BackendSink:
+    """POST event batches to a backend bulk endpoint."""
+
+    def __init__(self, backend: Any, partner_service: Any) -> None:
+        self._backend = backend
+        self._partner_service = partner_service
+
+    async def write(self, events: list[dict[str, Any]]) -> None:
+        partner_id = await self._partner_service.resolve_partner_id()
+        await self._backend.send_events({"events": events}, partner_id)
+
+    async def close(self) -> None:
+        return None
+
+
+class EventPipeline:
+    """Bounded ring buffer of events with batched background flushes."""
+
+    def __init__(
+        self,
+        sink: EventSink | None = None,
+        *,
+        capacity: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 5.0,
+    ) -> None:
+        self.sink = sink
+        self._buffer: deque[Event] = deque(maxlen=capacity)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._flush_task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._closing = False
+        self.emitted = 0
+        self.dropped = 0
+        self.failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sink is not None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "buffered": len(self._buffer),
+            "emitted": self.emitted,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def emit(self, event: Event) -> None:
+        if self.sink is None:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(event)
+        self.emitted += 1
+        if self._closing:
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._wakeup = asyncio.Event()
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+        elif len(self._buffer) >= self._batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            try:
+                async with asyncio.timeout(self._flush_interval):
+                    await self._wakeup.wait()
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        while self._buffer and self.sink is not None:
+            batch = [self._buffer.popleft().to_dict() for _ in range(min(self._batch_size, len(self._buffer)))]
+            try:
+                await self.sink.write(batch)
+            except Exception as exc:  # noqa: BLE001
+                self.failed += len(batch)
+                logger.warning("Event flush failed", extra={"error": str(exc), "events": len(batch)})
+                return
+
+    async def close(self) -> None:
+        # Stop the loop via the flag instead of cancel(): a cancellation can be
+        # lost when it races with the wakeup event, leaving close() waiting forever.
+        self._closing = True
+        if self._flush_task is not None:
+            if self._wakeup is not None:
+                self._wakeup.set()
+            await self._flush_task
+        await self.flush()
+        if self.sink is not None:
+            await self.sink.close()
+
+
+def build_event_sink(settings: Settings, backend: Any, redis_client: Redis, partner_service: Any) -> EventSink | None:
+    """Create the configured sink (``file``, ``redis`` or ``backend``), or ``None`` when disabled."""
+
+    sink = (settings.EVENTS_SINK or "").lower()
+    if not sink:
+        return None
+    if sink == "file":
+        return NdjsonFileSink(settings.EVENTS_FILE_DIR, settings.EVENTS_FILE_MAX_BYTES)
+    if sink == "redis":
+        stream = f"{settings.REDIS_PREFIX}:{settings.EVENTS_REDIS_STREAM}"
+        return RedisStreamSink(redis_client, stream, settings.EVENTS_REDIS_MAXLEN)
+    if sink == "backend":
+        return BackendSink(backend, partner_service)
+    raise ValueError(f"Unsupported events sink: {settings.EVENTS_SINK}")
@@ -28,3 +28,7 @@ class BackendTimeout(BackendError):
 
 class BackendBadResponse(BackendError):
     """Backend returned a malformed response."""
+
+
+class BackendOverloaded(BackendError):
+    """Request was shed locally because the backend is saturated."""
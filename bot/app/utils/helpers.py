@@ -6,6 +6,7 @@ from typing import Any, Iterable
 
 from aiogram.types import Chat, Message, User
 
+from bot.app.api.schemas import parse_messages
 from bot.app.keyboards.base import build_menu
 
 
@@ -87,8 +88,7 @@ def build_reply_markup(message_payload: dict[str, Any]):
 async def respond_with_payload(message: Message, payload: dict[str, Any] | list[dict[str, Any]] | None) -> None:
     """Send one or more messages based on backend response."""
 
-    for item in normalize_messages(payload):
-        text = extract_text(item)
-        reply_markup = build_reply_markup(item)
-        if text or reply_markup is not None:
-            await message.answer(text or " ", reply_markup=reply_markup)
+    for item in parse_messages(payload):
+        reply_markup = build_menu(item.menu) if item.menu else None
+        if item.text or reply_markup is not None:
+            await message.answer(item.text or " ", reply_markup=reply_markup)
@@ -0,0 +1,206 @@
+"""Event-loop lag watchdog and on-demand sampling profiler.
+
+Both tools observe the event loop from a daemon thread using
+``sys._current_frames``, so they can report what the loop is doing while it is
+blocked. The watchdog thread only wakes up every ``interval`` seconds and the
+profiler thread only runs while a profile is being captured, which keeps the
+steady-state overhead negligible.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from types import FrameType
+
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measure event-loop scheduling delay and dump the blocking stack.
+
+    Each stall past the threshold is reported once: as ``event_loop_blocked``
+    with the loop's stack if the watchdog catches it in progress, otherwise as
+    ``event_loop_lag`` when the heartbeat resumes.
+    """
+
+    def __init__(self, interval: float, threshold_ms: float) -> None:
+        self._interval = interval
+        self._threshold = threshold_ms / 1000
+        self._heartbeat = 0.0
+        self._reported_heartbeat = 0.0
+        self._lock = threading.Lock()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self.max_lag_ms = 0.0
+        self.last_lag_ms = 0.0
+        self.stalls = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._interval > 0
+
+    def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._measure())
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _measure(self) -> None:
+        while True:
+            expected = time.monotonic() + self._interval
+            await asyncio.sleep(self._interval)
+            now = time.monotonic()
+            with self._lock:
+                reported = self._reported_heartbeat == self._heartbeat
+                self._heartbeat = now
+            lag_ms = max(0.0, (now - expected) * 1000)
+            self.last_lag_ms = lag_ms
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            if lag_ms >= self._threshold * 1000 and not reported:
+                self.stalls += 1
+                logger.warning("event_loop_lag", extra={"lag_ms": int(lag_ms)})
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self._interval):
+            with self._lock:
+                heartbeat = self._heartbeat
+                stalled_for = time.monotonic() - heartbeat - self._interval
+                if stalled_for < self._threshold or heartbeat == self._reported_heartbeat:
+                    continue
+                self._reported_heartbeat = heartbeat
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            logger.warning(
+                "event_loop_blocked",
+                extra={"blocked_ms": int(stalled_for * 1000), "stack": stack},
+            )
+
+
+class SamplingProfiler:
+    """Statistical profiler that samples the event-loop thread stack.
+
+    Samples are aggregated as collapsed stacks (``frame;frame;frame count``),
+    the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval_ms: float, output_dir: str) -> None:
+        self._interval = interval_ms / 1000
+        self._output_dir = output_dir
+        self._loop_thread_id: int | None = None
+        self._thread: threading.Thread | None = None
+        self._running = threading.Event()
+        self._samples: Counter[str] = Counter()
+        self._armed_updates = 0
+
+    @property
+    def active(self) -> bool:
+        return self._running.is_set()
+
+    def start(self) -> None:
+        if self.active:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._samples = Counter()
+        self._running.set()
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self._samples
+
+    def arm(self, updates: int) -> None:
+        """Profile the next ``updates`` updates, then dump the result."""
+
+        if self.active:
+            return
+        self._armed_updates = updates
+        self.start()
+
+    async def update_finished(self) -> None:
+        if self._armed_updates <= 0:
+            return
+        self._armed_updates -= 1
+        if self._armed_updates == 0:
+            await self.dump("slow_updates")
+
+    async def dump(self, reason: str) -> str | None:
+        """Stop sampling and write collapsed stacks to the output directory."""
+
+        samples = self.stop()
+        self._armed_updates = 0
+        if not samples:
+            return None
+        path = os.path.join(self._output_dir, f"profile-{reason}-{int(time.time())}.folded")
+        data = "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+        await asyncio.to_thread(self._write, path, data)
+        logger.info("profile_dumped", extra={"path": path, "samples": sum(samples.values()), "reason": reason})
+        return path
+
+    def _write(self, path: str, data: str) -> None:
+        os.makedirs(self._output_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(data)
+
+    def _sample(self) -> None:
+        while self._running.is_set():
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._samples[_collapse(frame)] += 1
+            time.sleep(self._interval)
+
+    def install_signal_handler(self, duration: float, signum: int = getattr(signal, "SIGUSR1", 0)) -> None:
+        """Capture a ``duration`` second profile when ``signum`` is received."""
+
+        if not signum:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signum, lambda: loop.create_task(self._profile_for(duration)))
+        except (NotImplementedError, RuntimeError):
+            logger.warning("Profiler signal handler not supported on this platform")
+
+    async def _profile_for(self, duration: float) -> None:
+        if self.active:
+            return
+        self.start()
+        await asyncio.sleep(duration)
+        await self.dump("signal")
+
+
+def _collapse(frame: FrameType | None) -> str:
+    names: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
@@ -0,0 +1,344 @@
+"""Lightweight span-based tracing for per-update diagnostics.
+
+A trace is opened per update by ``TracingMiddleware`` and propagated through
+contextvars, so any code running inside the update can open child spans with
+:func:`span` without having the tracer passed around. When no trace is active
+(tracing disabled or the update was not sampled) :func:`span` returns a shared
+no-op object and costs a single contextvar lookup.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Protocol
+
+import httpx
+
+from bot.app.config import Settings
+
+
+logger = logging.getLogger(__name__)
+
+_current_trace: contextvars.ContextVar["Trace | None"] = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("span", default=None)
+
+
+class Span:
+    """Single timed operation inside a trace."""
+
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, parent_id: str | None, attributes: dict[str, Any]) -> None:
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1_000_000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    """Collection of spans recorded for one update."""
+
+    __slots__ = ("trace_id", "sampled", "spans")
+
+    def __init__(self, sampled: bool) -> None:
+        self.trace_id = os.urandom(16).hex()
+        self.sampled = sampled
+        self.spans: list[Span] = []
+
+    @property
+    def duration_ms(self) -> float:
+        if not self.spans:
+            return 0.0
+        root = self.spans[0]
+        end_ns = root.end_ns or time.time_ns()
+        return (end_ns - root.start_ns) / 1_000_000
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "sampled": self.sampled,
+            "duration_ms": round(self.duration_ms, 3),
+            "spans": [item.to_dict() for item in self.spans],
+        }
+
+
+class _NoopSpan:
+    """Span stand-in used when no trace is being recorded."""
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Any) -> None:
+        return None
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _SpanScope:
+    """Context manager that records a child span of the current span."""
+
+    __slots__ = ("_trace", "_name", "_attributes", "_span", "_token")
+
+    def __init__(self, trace: Trace, name: str, attributes: dict[str, Any]) -> None:
+        self._trace = trace
+        self._name = name
+        self._attributes = attributes
+
+    def __enter__(self) -> Span:
+        parent = _current_span.get()
+        self._span = Span(self._name, parent.span_id if parent else None, self._attributes)
+        self._trace.spans.append(self._span)
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> bool:
+        self._span.end_ns = time.time_ns()
+        if exc is not None:
+            self._span.error = type(exc).__name__
+        _current_span.reset(self._token)
+        return False
+
+
+class _TraceScope:
+    """Context manager that opens a trace and its root span."""
+
+    __slots__ = ("_tracer", "_name", "_attributes", "_trace", "_root", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: dict[str, Any]) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._attributes = attributes
+        self._trace: Trace | None = None
+
+    def __enter__(self) -> Span | _NoopSpan:
+        sampled = random.random() < self._tracer.sample_rate
+        if not sampled and self._tracer.slow_ms <= 0:
+            return _NOOP_SPAN
+        self._trace = Trace(sampled)
+        self._token = _current_trace.set(self._trace)
+        self._root = _SpanScope(self._trace, self._name, self._attributes)
+        return self._root.__enter__()
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> bool:
+        if self._trace is None:
+            return False
+        self._root.__exit__(exc_type, exc, tb)
+        _current_trace.reset(self._token)
+        self._tracer._finish(self._trace)
+        return False
+
+
+class SpanExporter(Protocol):
+    """Destination for finished traces."""
+
+    async def export(self, traces: list[dict[str, Any]]) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class JsonLinesExporter:
+    """Append traces as JSON lines to a local file (written off the event loop)."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+
+    async def export(self, traces: list[dict[str, Any]]) -> None:
+        data = "".join(json.dumps(item, ensure_ascii=True, default=str) + "\n" for item in traces)
+        await asyncio.to_thread(self._write, data)
+
+    def _write(self, data: str) -> None:
+        with open(self._path, "a", encoding="utf-8") as fh:
+            fh.write(data)
+
+    async def close(self) -> None:
+        return None
+
+
+class OtlpHttpExporter:
+    """Send traces to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float) -> None:
+        self._url = f"{endpoint.rstrip('/')}/v1/traces"
+        self._service_name = service_name
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    async def export(self, traces: list[dict[str, Any]]) -> None:
+        spans = [_otlp_span(trace["trace_id"], item) for trace in traces for item in trace["spans"]]
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otlp_attribute("service.name", self._service_name)]},
+                    "scopeSpans": [{"scope": {"name": "bot"}, "spans": spans}],
+                }
+            ]
+        }
+        response = await self._client.post(self._url, json=body)
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class Tracer:
+    """Per-update tracer with head-based and slow-threshold sampling."""
+
+    def __init__(
+        self,
+        exporter: SpanExporter | None,
+        *,
+        sample_rate: float = 0.0,
+        slow_ms: float = 0.0,
+        buffer_size: int = 1000,
+        flush_interval: float = 5.0,
+    ) -> None:
+        self._exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self._buffer: deque[Trace] = deque(maxlen=buffer_size)
+        self._flush_interval = flush_interval
+        self._flush_task: asyncio.Task | None = None
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._exporter is not None and (self.sample_rate > 0 or self.slow_ms > 0)
+
+    def trace(self, name: str, **attributes: Any) -> _TraceScope | _NoopSpan:
+        """Open a trace for the current update."""
+
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _TraceScope(self, name, attributes)
+
+    def _finish(self, trace: Trace) -> None:
+        if not trace.sampled and trace.duration_ms < self.slow_ms:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(trace)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while self._buffer:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._buffer or self._exporter is None:
+            return
+        batch = [item.to_dict() for item in self._buffer]
+        self._buffer.clear()
+        try:
+            await self._exporter.export(batch)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Trace export failed", extra={"error": str(exc), "traces": len(batch)})
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+        if self._exporter is not None:
+            await self._exporter.close()
+
+
+def span(name: str, **attributes: Any) -> _SpanScope | _NoopSpan:
+    """Open a child span of the active trace, or a no-op if none is active."""
+
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _SpanScope(trace, name, attributes)
+
+
+def current_traceparent() -> str | None:
+    """Return a W3C ``traceparent`` header value for the active span."""
+
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    active = _current_span.get()
+    span_id = active.span_id if active else "0" * 16
+    return f"00-{trace.trace_id}-{span_id}-{'01' if trace.sampled else '00'}"
+
+
+def build_tracer(settings: Settings) -> Tracer:
+    """Create tracer and exporter from settings."""
+
+    exporter: SpanExporter | None = None
+    if settings.TRACE_OTLP_ENDPOINT:
+        exporter = OtlpHttpExporter(
+            settings.TRACE_OTLP_ENDPOINT,
+            service_name=settings.TRACE_SERVICE_NAME,
+            timeout=settings.REQUEST_TIMEOUT,
+        )
+    elif settings.TRACE_EXPORT_PATH:
+        exporter = JsonLinesExporter(settings.TRACE_EXPORT_PATH)
+    return Tracer(
+        exporter,
+        sample_rate=settings.TRACE_SAMPLE_RATE,
+        slow_ms=settings.TRACE_SLOW_MS,
+        buffer_size=settings.TRACE_BUFFER_SIZE,
+        flush_interval=settings.TRACE_FLUSH_INTERVAL,
+    )
+
+
+def _otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_span(trace_id: str, item: dict[str, Any]) -> dict[str, Any]:
+    result: dict[str, Any] = {
+        "traceId": trace_id,
+        "spanId": item["span_id"],
+        "name": item["name"],
+        "kind": 1,
+        "startTimeUnixNano": str(item["start_ns"]),
+        "endTimeUnixNano": str(item["end_ns"]),
+        "attributes": [_otlp_attribute(key, value) for key, value in item["attributes"].items()],
+        "status": {"code": 2, "message": item["error"]} if item["error"] else {"code": 1},
+    }
+    if item["parent_id"]:
+        result["parentSpanId"] = item["parent_id"]
+    return result
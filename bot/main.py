@@ -6,7 +6,8 @@ import asyncio
 import logging
 
 from bot.app.config import get_settings
-from bot.app.core.bot import build_app
+from bot.app.core.bot import build_app, prewarm_session
+from bot.app.core.snapshot import load_snapshot, save_snapshot
 
 
 logger = logging.getLogger(__name__)
@@ -16,11 +17,19 @@ async def main() -> None:
     settings = get_settings()
     bot, dispatcher, deps = build_app(settings)
 
+    await load_snapshot(deps, settings)
+    deps.loop_monitor.start()
+    deps.backend.start_health_checks()
+    await deps.flow_service.start()
+    deps.profiler.install_signal_handler(settings.PROFILE_SIGNAL_SECONDS)
+    await prewarm_session(bot, settings.TELEGRAM_PREWARM_CONNECTIONS)
+
     logger.info("bot_starting")
     try:
         await dispatcher.start_polling(bot, allowed_updates=dispatcher.resolve_used_update_types())
     finally:
         logger.info("bot_shutdown")
+        await save_snapshot(deps, settings)
         await deps.close()
         await bot.session.close()
 
@@ -0,0 +1,117 @@
+import asyncio
+from typing import Any
+
+from aiogram.types import Update
+
+from bot.app.core.ingress import BACKGROUND, CRITICAL, INTERACTIVE, IngressScheduler, Lane, UpdateClassifier
+
+
+def _scheduler(max_concurrency: int = 1, overload_depth: int = 100, **depths: int) -> IngressScheduler:
+    lanes = [
+        Lane(CRITICAL, depths.get(CRITICAL, 10), 60.0),
+        Lane(INTERACTIVE, depths.get(INTERACTIVE, 10), 60.0),
+        Lane(BACKGROUND, depths.get(BACKGROUND, 10), 60.0, sheddable=True),
+    ]
+    return IngressScheduler(
+        lanes, max_concurrency=max_concurrency, overload_depth=overload_depth, overload_age=60.0
+    )
+
+
+def _update(**fields: Any) -> Update:
+    return Update.model_validate({"update_id": 1, **fields})
+
+
+def _message(text: str) -> dict[str, Any]:
+    user = {"id": 1, "is_bot": False, "first_name": "Test"}
+    return {"message_id": 1, "date": 0, "chat": {"id": 1, "type": "private"}, "from": user, "text": text}
+
+
+def _callback(data: str) -> dict[str, Any]:
+    user = {"id": 1, "is_bot": False, "first_name": "Test"}
+    return {"id": "1", "from": user, "chat_instance": "1", "data": data}
+
+
+def test_classifier_lanes() -> None:
+    classify = UpdateClassifier({"start"}, ("pay:",))
+    assert classify(_update(message=_message("/start payload"))) == CRITICAL
+    assert classify(_update(message=_message("/help@bot"))) == INTERACTIVE
+    assert classify(_update(message=_message("hello"))) == BACKGROUND
+    assert classify(_update(callback_query=_callback("pay:42"))) == CRITICAL
+    assert classify(_update(callback_query=_callback("menu:1"))) == INTERACTIVE
+
+
+def test_lanes_are_served_in_priority_order() -> None:
+    async def scenario() -> None:
+        scheduler = _scheduler()
+        order: list[str] = []
+
+        async def process(lane: str) -> None:
+            assert await scheduler.acquire(lane)
+            order.append(lane)
+            scheduler.release()
+
+        assert await scheduler.acquire(INTERACTIVE)
+        tasks = [asyncio.create_task(process(lane)) for lane in (BACKGROUND, INTERACTIVE, CRITICAL)]
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        assert order == [CRITICAL, INTERACTIVE, BACKGROUND]
+
+    asyncio.run(scenario())
+
+
+def test_background_is_shed_while_overloaded() -> None:
+    async def scenario() -> None:
+        scheduler = _scheduler(overload_depth=1)
+        assert await scheduler.acquire(INTERACTIVE)
+        waiting = asyncio.create_task(scheduler.acquire(INTERACTIVE))
+        await asyncio.sleep(0)
+        assert await scheduler.acquire(BACKGROUND) is False
+        assert scheduler.stats()["lanes"][BACKGROUND]["shed"] == 1
+        scheduler.release()
+        assert await waiting is True
+
+    asyncio.run(scenario())
+
+
+def test_full_lane_is_shed() -> None:
+    async def scenario() -> None:
+        scheduler = _scheduler(**{CRITICAL: 1})
+        assert await scheduler.acquire(CRITICAL)
+        waiting = asyncio.create_task(scheduler.acquire(CRITICAL))
+        await asyncio.sleep(0)
+        assert await scheduler.acquire(CRITICAL) is False
+        scheduler.release()
+        assert await waiting is True
+
+    asyncio.run(scenario())
+
+
+def test_expired_waiter_is_shed() -> None:
+    async def scenario() -> None:
+        scheduler = IngressScheduler(
+            [Lane(INTERACTIVE, 10, 0.01)], max_concurrency=1, overload_depth=100, overload_age=60.0
+        )
+        assert await scheduler.acquire(INTERACTIVE)
+        waiting = asyncio.create_task(scheduler.acquire(INTERACTIVE))
+        await asyncio.sleep(0.02)
+        scheduler.release()
+        assert await waiting is False
+        assert scheduler.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_frees_its_slot() -> None:
+    async def scenario() -> None:
+        scheduler = _scheduler()
+        assert await scheduler.acquire(INTERACTIVE)
+        waiting = asyncio.create_task(scheduler.acquire(INTERACTIVE))
+        await asyncio.sleep(0)
+        scheduler.release()
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert scheduler.stats()["in_flight"] == 0
+        assert await scheduler.acquire(BACKGROUND)
+
+    asyncio.run(scenario())
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from bot.app.api.limiter import AdaptiveLimiter, Priority
+from bot.app.utils.exceptions import BackendOverloaded
+
+
+async def _hold(limiter: AdaptiveLimiter, release: asyncio.Event, priority: Priority = Priority.HIGH) -> None:
+    async with limiter.slot(priority):
+        await release.wait()
+
+
+def test_cancelled_requests_do_not_shrink_limit() -> None:
+    async def scenario() -> None:
+        limiter = AdaptiveLimiter(initial_limit=20)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(_hold(limiter, release)) for _ in range(10)]
+        await asyncio.sleep(0)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert limiter.limit == 20
+        assert limiter.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_overload_backs_off() -> None:
+    async def scenario() -> None:
+        limiter = AdaptiveLimiter(initial_limit=20, backoff=0.5)
+        async with limiter.slot() as slot:
+            slot.overloaded = True
+        assert limiter.limit == 10
+
+    asyncio.run(scenario())
+
+
+def test_exception_without_overload_keeps_limit() -> None:
+    async def scenario() -> None:
+        limiter = AdaptiveLimiter(initial_limit=20)
+        with pytest.raises(RuntimeError):
+            async with limiter.slot():
+                raise RuntimeError("boom")
+        assert limiter.limit == 20
+        assert limiter.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_sheds_when_queue_is_full() -> None:
+    async def scenario() -> None:
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_queue=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(limiter, release))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(_hold(limiter, release))
+        await asyncio.sleep(0)
+        with pytest.raises(BackendOverloaded):
+            async with limiter.slot():
+                pass
+        assert limiter.shed == 1
+        release.set()
+        await asyncio.gather(holder, waiter)
+        assert limiter.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_sheds_after_max_wait() -> None:
+    async def scenario() -> None:
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_wait=0.01)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(limiter, release))
+        await asyncio.sleep(0)
+        with pytest.raises(BackendOverloaded):
+            async with limiter.slot():
+                pass
+        assert limiter.stats()["queued"] == {"high": 0, "low": 0}
+        release.set()
+        await holder
+
+    asyncio.run(scenario())
+
+
+def test_high_priority_is_served_first() -> None:
+    async def scenario() -> None:
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1)
+        order: list[Priority] = []
+
+        async def request(priority: Priority) -> None:
+            async with limiter.slot(priority):
+                order.append(priority)
+
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(limiter, release))
+        await asyncio.sleep(0)
+        low = asyncio.create_task(request(Priority.LOW))
+        high = asyncio.create_task(request(Priority.HIGH))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(holder, low, high)
+        assert order == [Priority.HIGH, Priority.LOW]
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue() -> None:
+    async def scenario() -> None:
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(limiter, release))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(_hold(limiter, release))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert limiter.stats()["queued"]["high"] == 0
+        release.set()
+        await holder
+        assert limiter.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,69 @@
+import asyncio
+
+from bot.app.api.routing import Endpoint, EndpointPool
+
+
+def test_prefers_faster_endpoint() -> None:
+    pool = EndpointPool(["http://a", "http://b"])
+    fast, slow = pool.endpoints
+    pool.report(fast, 0.01, ok=True)
+    pool.report(slow, 0.5, ok=True)
+    assert all(pool.choose() is fast for _ in range(20))
+    fast.in_flight = 100
+    assert pool.choose() is slow
+
+
+def test_failures_eject_without_inflating_latency() -> None:
+    pool = EndpointPool(["http://a", "http://b"], eject_after=3)
+    failing, healthy = pool.endpoints
+    for _ in range(3):
+        pool.report(failing, 10.0, ok=False)
+    assert failing.latency == 0.0
+    assert pool.stats()[0]["ejected"] is True
+    assert all(pool.choose() is healthy for _ in range(20))
+    assert pool.choose(exclude={healthy}) is failing
+
+
+def test_single_endpoint_is_never_ejected() -> None:
+    pool = EndpointPool(["http://a"], eject_after=1)
+    pool.report(pool.endpoints[0], 1.0, ok=False)
+    assert pool.stats()[0]["ejected"] is False
+
+
+def test_health_check_restores_ejected_endpoint() -> None:
+    async def scenario() -> None:
+        pool = EndpointPool(["http://a", "http://b"], eject_after=1, eject_seconds=60.0)
+        ejected, healthy = pool.endpoints
+        pool.report(healthy, 0.2, ok=True)
+        pool.report(ejected, 1.0, ok=False)
+
+        async def check(endpoint: Endpoint) -> bool:
+            return True
+
+        pool.start_health_checks(check, 0.01)
+        await asyncio.sleep(0.05)
+        await pool.stop_health_checks()
+        assert pool.stats()[0]["ejected"] is False
+        assert ejected.latency <= healthy.latency
+        assert ejected.failures == 0
+
+    asyncio.run(scenario())
+
+
+def test_failed_health_checks_keep_endpoint_ejected() -> None:
+    async def scenario() -> None:
+        pool = EndpointPool(["http://a", "http://b"], eject_after=1, eject_seconds=60.0)
+        ejected = pool.endpoints[0]
+        pool.report(ejected, 1.0, ok=False)
+
+        async def check(endpoint: Endpoint) -> bool:
+            if endpoint is ejected:
+                raise OSError("connection refused")
+            return True
+
+        pool.start_health_checks(check, 0.01)
+        await asyncio.sleep(0.05)
+        await pool.stop_health_checks()
+        assert pool.stats()[0]["ejected"] is True
+
+    asyncio.run(scenario())
@@ -0,0 +1,107 @@
+import asyncio
+from typing import Any
+
+from bot.app.config import Settings
+from bot.app.services.search import InlineSearchService
+
+
+def _settings(**overrides: Any) -> Settings:
+    values: dict[str, Any] = {
+        "BOT_TOKEN": "42:test",
+        "API_URL": "http://backend.invalid",
+        "API_TOKEN": "test",
+        "SEARCH_DEBOUNCE_MS": 10,
+        **overrides,
+    }
+    return Settings(**values)
+
+
+class FakeBackend:
+    def __init__(self, delay: float = 0.0, **response: Any) -> None:
+        self.delay = delay
+        self.response = response
+        self.requests: list[dict[str, Any]] = []
+        self.cancelled = 0
+
+    async def search(self, payload: dict[str, Any], partner_id: str | None) -> dict[str, Any]:
+        self.requests.append(payload)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {"results": [{"id": str(payload["user"]), "title": payload["query"]}], **self.response}
+
+
+def _payload(user_id: int) -> dict[str, Any]:
+    return {"user": user_id}
+
+
+def test_superseded_query_returns_none() -> None:
+    async def scenario() -> None:
+        backend = FakeBackend()
+        service = InlineSearchService(backend, _settings())
+        first = asyncio.create_task(service.search(1, None, "pi", "", _payload(1)))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(service.search(1, None, "Pizza", "", _payload(1)))
+        assert await first is None
+        result = await second
+        assert result is not None
+        assert [item["query"] for item in backend.requests] == ["pizza"]
+
+    asyncio.run(scenario())
+
+
+def test_superseded_query_cancels_backend_request() -> None:
+    async def scenario() -> None:
+        backend = FakeBackend(delay=1.0)
+        service = InlineSearchService(backend, _settings())
+        first = asyncio.create_task(service.search(1, None, "pizza", "", _payload(1)))
+        await asyncio.sleep(0.05)
+        assert len(backend.requests) == 1
+        backend.delay = 0.0
+        second = asyncio.create_task(service.search(1, None, "pasta", "", _payload(1)))
+        assert await first is None
+        assert await second is not None
+        assert backend.cancelled == 1
+
+    asyncio.run(scenario())
+
+
+def test_personal_results_are_not_shared() -> None:
+    async def scenario() -> None:
+        backend = FakeBackend(delay=0.05, is_personal=True)
+        service = InlineSearchService(backend, _settings())
+        first, second = await asyncio.gather(
+            service.search(1, None, "orders", "", _payload(1)),
+            service.search(2, None, "orders", "", _payload(2)),
+        )
+        assert len(backend.requests) == 2
+        assert first.results[0]["id"] == "1"
+        assert second.results[0]["id"] == "2"
+
+    asyncio.run(scenario())
+
+
+def test_known_public_queries_share_one_request() -> None:
+    async def scenario() -> None:
+        backend = FakeBackend(delay=0.05)
+        service = InlineSearchService(backend, _settings(SEARCH_CACHE_TTL=0))
+        await service.search(1, None, "pizza", "", _payload(1))
+        await asyncio.gather(
+            service.search(2, None, "pizza", "", _payload(2)),
+            service.search(3, None, "pizza", "", _payload(3)),
+        )
+        assert len(backend.requests) == 2
+
+    asyncio.run(scenario())
+
+
+def test_invalid_cache_time_falls_back_to_default() -> None:
+    async def scenario() -> None:
+        backend = FakeBackend(cache_time="soon")
+        service = InlineSearchService(backend, _settings(SEARCH_CACHE_TIME=30))
+        result = await service.search(1, None, "pizza", "", _payload(1))
+        assert result.cache_time == 30
+
+    asyncio.run(scenario())